@@ -19,6 +19,10 @@ import math
 import time
 import base64
 import tempfile
+import zlib
+import functools
+import contextlib
+import collections
 import multiprocessing
 
 # conda's onnxruntime/scipy/numpy can load two OpenMP runtimes, which aborts
@@ -44,8 +48,8 @@ from PySide6.QtGui import (
     QFont, QPainterPath, QPolygon, QTransform
 )
 from PySide6.QtCore import (
-    Qt, QPoint, QPointF, QRect, QBuffer, QByteArray, QSize, Signal, QUrl,
-    QMimeData, QTimer, QThread, QSettings
+    Qt, QPoint, QPointF, QRect, QSize, Signal, QUrl,
+    QMimeData, QTimer, QThread, QSettings, QMutex, QMutexLocker, QByteArray
 )
 
 # --- Optional / heavy imports (loaded lazily during splash) ---
@@ -64,7 +68,26 @@ try:
 except ImportError:
     CV2_AVAILABLE = False
 
-from PIL import Image, ImageDraw, ImageQt, ImageFilter
+# Optional JIT for the Magic Wand flood fill and colour removal; SciPy
+# labelling / plain NumPy are the fallbacks.
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# The Magic Wand fill needs one of the two: Numba's seeded BFS needs no
+# component labelling at all.
+WAND_AVAILABLE = NUMBA_AVAILABLE or SCIPY_AVAILABLE
+
+# Optional fast codec for undo snapshots; zlib level 1 is the fallback.
+try:
+    import lz4.block as lz4_block
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+from PIL import Image, ImageDraw, ImageFilter
 
 APP_NAME = "Background Remover"
 APP_TAGLINE = "Professional Edition"
@@ -183,6 +206,10 @@ REMBG_MODELS = [
     "birefnet-massive", "sam",
 ]
 
+# Model precisions selectable in Preferences. FP16 / INT8 load the variants
+# built offline by tools/quantize_rembg.py; FP32 is the stock download.
+REMBG_PRECISIONS = ("FP32", "FP16", "INT8")
+
 # OpenCV (dnn_superres) CNN super-resolution models. Each entry maps a
 # scale factor to (local filename, download URL). Models are fetched on
 # demand into MODELS_DIR; when none is available the code falls back to
@@ -254,7 +281,11 @@ REALESRGAN_MODELS = {
 
 def preferred_ort_providers(use_gpu=True):
     """Ordered onnxruntime execution providers, preferring hardware
-    acceleration (CUDA / Apple CoreML / DirectML) when available."""
+    acceleration (CUDA / Apple CoreML / DirectML) when available.
+
+    CoreML is asked for the ML Program format, which covers more of the
+    models' operators than the default NeuralNetwork format, so fewer
+    nodes fall back to the CPU."""
     try:
         import onnxruntime as ort
         avail = set(ort.get_available_providers())
@@ -266,13 +297,92 @@ def preferred_ort_providers(use_gpu=True):
     else:
         order = ["CPUExecutionProvider"]
     picked = [p for p in order if p in avail]
+    picked = [(p, {"ModelFormat": "MLProgram"}) if p == "CoreMLExecutionProvider" else p
+              for p in picked]
     return picked or None
 
 
+def rembg_session_options():
+    """onnxruntime SessionOptions for interactive rembg inference: one core
+    is left free for the UI thread and operators run sequentially, so a
+    single image doesn't spawn a thread pool that fights the event loop."""
+    import onnxruntime as ort
+    so = ort.SessionOptions()
+    so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    so.intra_op_num_threads = max(1, (os.cpu_count() or 2) - 1)
+    so.inter_op_num_threads = 1
+    so.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    return so
+
+
+def new_rembg_session(model_name, providers=None, precision="FP32"):
+    """Build a rembg session that uses rembg_session_options().
+
+    With an FP16/INT8 `precision` whose variant file exists (see
+    rembg_model_variant) that graph is loaded instead of the stock FP32 one,
+    falling back to FP32 if it won't load. If the requested providers can't
+    be initialised the session is retried with onnxruntime's defaults.
+    Callers should always pass the result to remove_bg: without a session
+    rembg rebuilds one on every call (and ignores the chosen model).
+    """
+    model_path = rembg_model_variant(model_name, precision)
+    if model_path:
+        try:
+            return _new_rembg_session_any_provider(model_name, providers, model_path)
+        except Exception as e:
+            print(f"Could not load {precision} rembg model ({e}); using FP32.")
+    return _new_rembg_session_any_provider(model_name, providers, None)
+
+
+def _new_rembg_session_any_provider(model_name, providers, model_path):
+    if providers:
+        try:
+            return _new_rembg_session(model_name, providers, model_path)
+        except Exception as e:
+            print(f"Could not create accelerated rembg session ({e}); using default providers.")
+    return _new_rembg_session(model_name, None, model_path)
+
+
+def _rembg_session_class(model_name):
+    from rembg.sessions import sessions_class
+    for cls in sessions_class:
+        if cls.name() == model_name:
+            return cls
+    raise ValueError(f"Unknown rembg model '{model_name}'")
+
+
+def _new_rembg_session(model_name, providers, model_path=None):
+    from rembg import new_session
+    kwargs = {"providers": providers} if providers else {}
+    so = rembg_session_options()
+    if model_path:
+        # Same pre/post-processing as the stock model; only the graph differs.
+        base = _rembg_session_class(model_name)
+        cls = type(base.__name__, (base,),
+                   {"download_models": classmethod(lambda cls, *a, **kw: model_path)})
+        return cls(model_name, so, **kwargs)
+    try:
+        return new_session(model_name, sess_opts=so, **kwargs)
+    except TypeError:
+        # Older rembg always builds its own SessionOptions inside
+        # new_session(); hand ours to the session class directly instead.
+        return _rembg_session_class(model_name)(model_name, so, **kwargs)
+
+
 def model_is_downloaded(model_name):
     return os.path.exists(os.path.join(MODELS_DIR, f"{model_name}.onnx"))
 
 
+def rembg_model_variant(model_name, precision):
+    """Path of the reduced-precision copy of `model_name` that
+    tools/quantize_rembg.py writes next to it, or None for FP32 or when that
+    variant hasn't been built."""
+    if precision not in REMBG_PRECISIONS or precision == "FP32":
+        return None
+    path = os.path.join(MODELS_DIR, f"{model_name}_{precision.lower()}.onnx")
+    return path if os.path.exists(path) else None
+
+
 def ensure_rembg():
     """Attempt to import rembg lazily. Returns True on success."""
     global REMBG_AVAILABLE, remove_bg
@@ -288,52 +398,181 @@ def ensure_rembg():
     return REMBG_AVAILABLE
 
 
+# Largest input any of REMBG_MODELS runs at (isnet/birefnet/sam: 1024 px;
+# the u2net family: 320 px).
+REMBG_MAX_INPUT = 1024
+
+
+def rembg_cutout(img, session, alpha_matting=False, **matting_kwargs):
+    """remove_bg(img) as an RGBA PIL image, cheaper for large photos.
+
+    The model never sees more than REMBG_MAX_INPUT pixels, so without alpha
+    matting a bigger image is shrunk (fast, reducing_gap) before inference and
+    only the predicted mask is scaled back up, rather than rembg Lanczos-
+    resampling the full image down and its mask up. The cut-out itself is
+    rembg's own composite. Alpha matting needs full-resolution pixels, so it
+    keeps the stock path.
+    """
+    if alpha_matting or max(img.size) <= REMBG_MAX_INPUT:
+        result = remove_bg(img, session=session, alpha_matting=alpha_matting, **matting_kwargs)
+        if not isinstance(result, Image.Image):
+            result = Image.open(io.BytesIO(result))
+        return result.convert("RGBA")
+    small = img.convert("RGB")
+    small.thumbnail((REMBG_MAX_INPUT, REMBG_MAX_INPUT), Image.Resampling.BILINEAR, reducing_gap=2.0)
+    mask = remove_bg(small, session=session, only_mask=True).convert("L")
+    if CV2_AVAILABLE:
+        mask = Image.fromarray(cv2.resize(np.asarray(mask), img.size, interpolation=cv2.INTER_LINEAR))
+    else:
+        mask = mask.resize(img.size, Image.Resampling.BILINEAR)
+    rgba = img if img.mode == "RGBA" else img.convert("RGBA")
+    return Image.composite(rgba, Image.new("RGBA", img.size, 0), mask)
+
+
 # ======================================================================
 # Helper functions
 # ======================================================================
 
+_wait_cursor_depth = 0
+
+
+@contextlib.contextmanager
+def wait_cursor():
+    """Show the busy cursor for the duration of the block. Nested blocks
+    share the outer override instead of pushing another one."""
+    global _wait_cursor_depth
+    if _wait_cursor_depth == 0:
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+    _wait_cursor_depth += 1
+    try:
+        yield
+    finally:
+        _wait_cursor_depth -= 1
+        if _wait_cursor_depth == 0:
+            QApplication.restoreOverrideCursor()
+
+
+def new_rgba_qimage(width, height):
+    """A Qt-owned RGBA8888 QImage and a writable (h, w, 4) NumPy view of it.
+
+    Filling the view instead of wrapping a Python buffer means the QImage
+    (and any QPixmap that ends up sharing it) never points at memory that
+    Python may free.
+    """
+    qimg = QImage(width, height, QImage.Format.Format_RGBA8888)
+    rows = np.frombuffer(qimg.bits(), np.uint8).reshape(height, qimg.bytesPerLine())
+    return qimg, rows[:, :4 * width].reshape(height, width, 4)
+
+
+def rgba_qimage_to_qpixmap(qimg):
+    """QPixmap from a QImage built by new_rgba_qimage, consuming it.
+
+    Converting in place to the raster backing-store format first lets
+    fromImage adopt the buffer instead of converting into a second copy.
+    """
+    qimg.convertTo(QImage.Format.Format_ARGB32_Premultiplied)
+    return QPixmap.fromImage(qimg, Qt.ImageConversionFlag.NoFormatConversion)
+
+
 def pil_to_qpixmap(pil_image):
+    """PIL image -> QPixmap via a raw RGBA buffer (no ImageQt intermediate)."""
     if pil_image is None:
         return QPixmap()
     try:
-        return QPixmap.fromImage(ImageQt.ImageQt(pil_image.convert("RGBA")))
+        img = pil_image if pil_image.mode == "RGBA" else pil_image.convert("RGBA")
+        qimg, view = new_rgba_qimage(img.width, img.height)
+        view[...] = np.asarray(img)
+        return rgba_qimage_to_qpixmap(qimg)
     except Exception as e:
         print(f"Error converting PIL to QPixmap: {e}")
         return QPixmap()
 
 
 def qimage_to_pil(qimage):
+    """QImage -> RGBA PIL image by reading the pixel buffer directly instead
+    of encoding and decoding a PNG."""
     if qimage.isNull():
         return None
-    buffer = QBuffer()
-    buffer.open(QBuffer.OpenModeFlag.ReadWrite)
-    qimage.save(buffer, 'PNG')
-    return Image.open(io.BytesIO(buffer.data())).convert('RGBA')
+    qimg = qimage.convertToFormat(QImage.Format.Format_RGBA8888)
+    w, h = qimg.width(), qimg.height()
+    rows = np.frombuffer(qimg.constBits(), np.uint8).reshape(h, qimg.bytesPerLine())
+    # Copy out of Qt's buffer (and drop any row padding) before qimg goes away.
+    arr = rows[:, :4 * w].copy().reshape(h, w, 4)
+    return Image.fromarray(arr, 'RGBA')
+
+
+def pack_image(pil_image, base=None):
+    """Compress a PIL image's raw pixels into a dict for the undo history.
+
+    With a same-sized `base` image the XOR against it is stored instead;
+    most edits touch only part of the image (or only alpha), so that is
+    mostly zeros and compresses to a fraction of a full snapshot.
+    """
+    raw = pil_image.tobytes()
+    delta = base is not None and base.mode == pil_image.mode and base.size == pil_image.size
+    if delta:
+        raw = np.bitwise_xor(np.frombuffer(raw, np.uint8), np.frombuffer(base.tobytes(), np.uint8))
+    if LZ4_AVAILABLE:
+        data, codec = lz4_block.compress(raw, store_size=True), "lz4"
+    else:
+        data, codec = zlib.compress(raw, 1), "zlib"
+    return {"raw": data, "codec": codec, "mode": pil_image.mode, "size": pil_image.size,
+            "delta": delta}
+
+
+def unpack_image(packed, base=None):
+    """Inverse of pack_image; `base` must be given for a delta."""
+    if packed["codec"] == "lz4":
+        raw = lz4_block.decompress(packed["raw"])
+    else:
+        raw = zlib.decompress(packed["raw"])
+    if packed["delta"]:
+        raw = np.bitwise_xor(np.frombuffer(raw, np.uint8), np.frombuffer(base.tobytes(), np.uint8))
+    return Image.frombytes(packed["mode"], packed["size"], raw)
 
 
 def flatten_image(pil_image, bg_color=(255, 255, 255)):
     """Composite an RGBA image over a solid background, returning RGB."""
-    img = pil_image.convert('RGBA')
+    img = pil_image if pil_image.mode == 'RGBA' else pil_image.convert('RGBA')
     background = Image.new('RGB', img.size, bg_color)
     background.paste(img, mask=img.getchannel('A'))
     return background
 
 
-def create_checkerboard(width, height, grid_size=40):
-    pixmap = QPixmap(width, height)
-    pixmap.fill(Qt.GlobalColor.transparent)
-    painter = QPainter(pixmap)
-    color1, color2 = QColor(200, 200, 200), QColor(230, 230, 230)
-    for y in range(0, height, grid_size):
-        for x in range(0, width, grid_size):
-            painter.setBrush(color1 if (x // grid_size + y // grid_size) % 2 == 0 else color2)
-            painter.drawRect(x, y, grid_size, grid_size)
+@functools.lru_cache(maxsize=16)
+def create_checkerboard_tile(grid_size=40):
+    """One 2x2-cell checkerboard tile, painted once per grid size.
+
+    Use it as a QBrush texture (fillRect / drawTiledPixmap) so Qt repeats the
+    pattern at blit speed instead of allocating a full-size checkerboard for
+    every display refresh. Callers must treat the result as read-only.
+    """
+    g = max(1, int(grid_size))
+    tile = QPixmap(2 * g, 2 * g)
+    tile.fill(QColor(200, 200, 200))
+    painter = QPainter(tile)
+    light = QColor(230, 230, 230)
+    painter.fillRect(g, 0, g, g, light)
+    painter.fillRect(0, g, g, g, light)
     painter.end()
-    return pixmap
+    return tile
+
+
+# Largest brush cursor pixmap (the biggest cursor Windows supports). Larger
+# brushes get a crosshair plus an outline painted on the canvas instead. The
+# cache holds a full zoom sweep of one brush (1.25x steps up to that size).
+MAX_CURSOR_SIZE = 256
 
 
 def create_brush_cursor(diameter, color):
-    diameter = max(1, int(diameter))
+    # update_cursor runs on every zoom / brush-size / mode change; the same
+    # few sizes recur, so reuse each rendered cursor.
+    return _brush_cursor(min(MAX_CURSOR_SIZE - 4, max(1, int(diameter))), color.rgb())
+
+
+@functools.lru_cache(maxsize=32)
+def _brush_cursor(diameter, rgb):
+    color = QColor.fromRgb(rgb)
     pix_size = max(32, diameter + 4)
     pixmap = QPixmap(pix_size, pix_size)
     pixmap.fill(Qt.GlobalColor.transparent)
@@ -407,6 +646,156 @@ def create_splash_pixmap(width=560, height=340):
     return pixmap
 
 
+# ======================================================================
+# Magic Wand flood fill / colour removal
+# ======================================================================
+
+if NUMBA_AVAILABLE:
+    # On-disk caching needs a writable __pycache__, which frozen builds lack.
+    @njit(cache=not getattr(sys, "frozen", False))
+    def _wand_fill_numba(rgb, sy, sx, tol_sq):
+        """4-connected BFS from (sy, sx) over pixels within `tol_sq` squared
+        RGB distance of the seed. Only the seed's component is visited."""
+        h, w = rgb.shape[0], rgb.shape[1]
+        mask = np.zeros((h, w), dtype=np.bool_)
+        r0, g0, b0 = int(rgb[sy, sx, 0]), int(rgb[sy, sx, 1]), int(rgb[sy, sx, 2])
+        # Every pixel is queued at most once (marked on push), so a flat
+        # array of h*w indices is enough; no wrap-around needed.
+        queue = np.empty(h * w, dtype=np.int32)
+        head, tail = 0, 1
+        queue[0] = sy * w + sx
+        mask[sy, sx] = True
+        while head < tail:
+            idx = queue[head]
+            head += 1
+            y, x = idx // w, idx % w
+            for dy, dx in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+                ny, nx = y + dy, x + dx
+                if ny < 0 or ny >= h or nx < 0 or nx >= w or mask[ny, nx]:
+                    continue
+                dr = int(rgb[ny, nx, 0]) - r0
+                dg = int(rgb[ny, nx, 1]) - g0
+                db = int(rgb[ny, nx, 2]) - b0
+                if dr * dr + dg * dg + db * db <= tol_sq:
+                    mask[ny, nx] = True
+                    queue[tail] = ny * w + nx
+                    tail += 1
+        return mask
+
+
+class ScratchPool:
+    """Reusable NumPy work buffers, one flat buffer per dtype grown to the
+    largest request, so repeated operations on a large image reuse memory
+    that is already paged in instead of faulting in fresh multi-MB arrays.
+
+    A buffer is only valid until the next get() of the same dtype, so
+    callers must not keep what they are handed.
+    """
+
+    def __init__(self):
+        self._buffers = {}
+
+    def get(self, shape, dtype):
+        dtype = np.dtype(dtype)
+        n = int(np.prod(shape))
+        buf = self._buffers.get(dtype)
+        if buf is None or buf.size < n:
+            buf = self._buffers[dtype] = np.empty(n, dtype)
+        return buf[:n].reshape(shape)
+
+    def clear(self):
+        self._buffers.clear()
+
+
+def color_distance_sq(rgb, color, scratch=None):
+    """Squared Euclidean RGB distance of every pixel in `rgb` to `color`.
+
+    Differences fit in int16, and einsum squares and sums the channels in
+    one pass, accumulating in int32 (max 3 * 255**2). With a ScratchPool the
+    intermediate and the result live in its buffers.
+    """
+    color = np.asarray(color, np.int16)
+    if scratch is None:
+        d = np.subtract(rgb, color, dtype=np.int16)
+        return np.einsum('ijc,ijc->ij', d, d, dtype=np.int32)
+    d = np.subtract(rgb, color, dtype=np.int16, out=scratch.get(rgb.shape, np.int16))
+    return np.einsum('ijc,ijc->ij', d, d, dtype=np.int32, out=scratch.get(rgb.shape[:2], np.int32))
+
+
+def wand_flood_fill(rgb, x, y, tolerance, scratch=None):
+    """Boolean mask of the 4-connected region around (x, y) whose colours lie
+    within `tolerance` (Euclidean RGB distance) of the clicked pixel.
+
+    Uses the Numba BFS when available, which only touches the selected
+    region; otherwise labels the tolerance mask with SciPy inside a window
+    around the seed that doubles until the region no longer reaches one of
+    its inner edges (a 4-connected region can only leave through them).
+    """
+    tol_sq = int(tolerance) ** 2
+    if NUMBA_AVAILABLE:
+        return _wand_fill_numba(np.ascontiguousarray(rgb, dtype=np.uint8), int(y), int(x), tol_sq)
+    h, w = rgb.shape[:2]
+    seed = rgb[y, x]
+    half = 128
+    while True:
+        y0, y1 = max(0, y - half), min(h, y + half + 1)
+        x0, x1 = max(0, x - half), min(w, x + half + 1)
+        labeled_array, _ = scipy_label(color_distance_sq(rgb[y0:y1, x0:x1], seed, scratch) <= tol_sq)
+        region = labeled_array == labeled_array[y - y0, x - x0]
+        clipped = ((y0 > 0 and region[0].any()) or (y1 < h and region[-1].any()) or
+                   (x0 > 0 and region[:, 0].any()) or (x1 < w and region[:, -1].any()))
+        if not clipped:
+            break
+        half *= 2
+    mask = np.zeros((h, w), dtype=bool)
+    mask[y0:y1, x0:x1] = region
+    return mask
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=not getattr(sys, "frozen", False))
+    def _color_remove_numba(rgba, r0, g0, b0, tol_sq):
+        """Zero alpha in place wherever RGB is within `tol_sq` squared
+        distance of (r0, g0, b0). Rows are split across threads."""
+        h, w = rgba.shape[0], rgba.shape[1]
+        for y in prange(h):
+            for x in range(w):
+                dr = int(rgba[y, x, 0]) - r0
+                dg = int(rgba[y, x, 1]) - g0
+                db = int(rgba[y, x, 2]) - b0
+                if dr * dr + dg * dg + db * db <= tol_sq:
+                    rgba[y, x, 3] = 0
+
+
+def remove_color(rgba, color, tolerance, scratch=None):
+    """Clear alpha in an (h, w, 4) uint8 array, in place, for every pixel
+    within `tolerance` (Euclidean RGB distance) of `color`."""
+    tol_sq = int(tolerance) ** 2
+    r0, g0, b0 = (int(c) for c in color[:3])
+    if NUMBA_AVAILABLE and rgba.flags.c_contiguous:
+        _color_remove_numba(rgba, r0, g0, b0, tol_sq)
+        return rgba
+    if tol_sq == 0:
+        # Exact match: three byte compares, no widening or squaring.
+        match = rgba[:, :, 0] == r0
+        match &= rgba[:, :, 1] == g0
+        match &= rgba[:, :, 2] == b0
+    else:
+        match = color_distance_sq(rgba[:, :, :3], (r0, g0, b0), scratch) <= tol_sq
+    rgba[:, :, 3][match] = 0
+    return rgba
+
+
+def warm_up_wand_kernel():
+    """Compile the Magic Wand BFS for the argument types it is called with.
+    Frozen builds can't keep Numba's on-disk cache and would otherwise JIT
+    (about a second) on the first wand click of every launch, which runs on
+    the UI thread. The parallel colour-removal kernel is left to compile on
+    first use: loading it on a worker thread hangs interpreter shutdown."""
+    if NUMBA_AVAILABLE:
+        _wand_fill_numba.compile("(uint8[:, :, ::1], int64, int64, int64)")
+
+
 # ======================================================================
 # Perspective correction (OpenCV)
 # ======================================================================
@@ -835,6 +1224,47 @@ def export_to_svg(path, pil_image, opts):
         f.write(svg)
 
 
+# ======================================================================
+# Brush stroke masks
+# ======================================================================
+
+def stamp_segment(mask, p0, p1, diameter):
+    """Stamp a round-capped line of `diameter` from p0 to p1 (image coords)
+    into `mask` and return the (x0, y0, x1, y1) box it touched, or None.
+
+    This matches the overlay's antialiased QPen: the pen is centred on pixel
+    corners, so a pixel is marked when its centre lies within the pen radius
+    of the segment, i.e. when at least about half of it is painted. Only the
+    segment's bounding box is evaluated, which is a few brush widths for the
+    short segments a drag produces. Brushes are at least 2 px: Qt draws
+    thinner pens as hairlines that don't follow the pen geometry.
+
+    cv2.line is deliberately not used: its thick-line rasteriser doesn't
+    produce this footprint at any width or sub-pixel offset, so its masks
+    always strayed outside or fell short of the visible stroke."""
+    (x0, y0), (x1, y1) = p0, p1
+    h, w = mask.shape
+    r = max(1.0, diameter / 2.0)
+    # Pixel i is reachable when |i + 0.5 - x| <= r.
+    bx0 = max(0, int(math.ceil(min(x0, x1) - r - 0.5)))
+    by0 = max(0, int(math.ceil(min(y0, y1) - r - 0.5)))
+    bx1 = min(w, int(math.floor(max(x0, x1) + r - 0.5)) + 1)
+    by1 = min(h, int(math.floor(max(y0, y1) + r - 0.5)) + 1)
+    if bx0 >= bx1 or by0 >= by1:
+        return None
+    px = np.arange(bx0, bx1, dtype=np.float32)[None, :] + (0.5 - x0)
+    py = np.arange(by0, by1, dtype=np.float32)[:, None] + (0.5 - y0)
+    dx, dy = x1 - x0, y1 - y0
+    length2 = dx * dx + dy * dy
+    if length2 > 0:
+        t = np.clip((px * dx + py * dy) / length2, 0.0, 1.0)
+        px = px - t * dx
+        py = py - t * dy
+    region = mask[by0:by1, bx0:bx1]
+    region[px * px + py * py <= r * r] = 255
+    return bx0, by0, bx1, by1
+
+
 # ======================================================================
 # Interactive image label
 # ======================================================================
@@ -855,8 +1285,15 @@ class InteractiveLabel(QLabel):
         self.crop_start_point, self.crop_end_point = QPoint(), QPoint()
         self.crop_rect_visual = None
         self.base_pixmap, self.overlay_pixmap = QPixmap(), QPixmap()
+        self.backdrop_color = None   # painted behind the image; None = checkerboard
+        # Authoritative Keep/Remove marks (uint8, 255 = marked, image-sized);
+        # overlay_pixmap is only their on-screen visual.
+        self.keep_mask, self.remove_mask = None, None
+        self.marks_box = None           # (x0, y0, x1, y1) bounding all marks
+        self._last_img_point = None
         self.wand_preview_pixmap = QPixmap()
         self.wand_selection_mask = None
+        self.wand_selection_mask_np = None   # bool view of the mask above
 
         # Perspective correction state
         self.perspective_points = []          # list[QPoint] in image coords
@@ -867,9 +1304,20 @@ class InteractiveLabel(QLabel):
         self.show_grid = False
         self.grid_spacing = 50          # in image pixels
 
+        # Brush strokes: mouse moves are appended to a pending path that is
+        # painted onto overlay_pixmap at most once per frame and on release.
+        self._pending_path = None
+        self._stroke_painter = None
+        self._stroke_timer = QTimer(self)
+        self._stroke_timer.setSingleShot(True)
+        self._stroke_timer.setInterval(16)
+        self._stroke_timer.timeout.connect(self._flush_stroke)
+
         self.zoom_level = 1.0
         self.brush_size = 10
         self.scroll_area = None
+        # Hover position of a brush too big for a cursor (see update_cursor).
+        self._brush_outline_pos = None
 
         self.setMouseTracking(True)
         self.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
@@ -877,33 +1325,83 @@ class InteractiveLabel(QLabel):
     def set_scroll_area(self, scroll_area):
         self.scroll_area = scroll_area
 
+    def set_backdrop(self, color):
+        """Colour shown through transparent pixels (None for the checkerboard).
+        Painted per exposed area in paintEvent, so no image-sized composite
+        is ever built."""
+        self.backdrop_color = QColor(color) if color else None
+        self.update()
+
     def set_display_pixmap(self, pixmap):
+        self._end_stroke_painter()
         self.base_pixmap = pixmap if pixmap else QPixmap()
         if not self.base_pixmap.isNull():
             if self.overlay_pixmap.isNull() or self.overlay_pixmap.size() != self.base_pixmap.size():
                 self.overlay_pixmap = QPixmap(self.base_pixmap.size())
                 self.overlay_pixmap.fill(Qt.GlobalColor.transparent)
+                shape = (self.base_pixmap.height(), self.base_pixmap.width())
+                self.keep_mask = np.zeros(shape, dtype=np.uint8)
+                self.remove_mask = np.zeros(shape, dtype=np.uint8)
+                self.marks_box = None
                 self.wand_preview_pixmap = QPixmap(self.base_pixmap.size())
                 self.wand_preview_pixmap.fill(Qt.GlobalColor.transparent)
             self.set_zoom(self.zoom_level)
         else:
             self.overlay_pixmap = QPixmap()
+            self.keep_mask, self.remove_mask = None, None
+            self.marks_box = None
             self.wand_preview_pixmap = QPixmap()
         self.update()
 
     def clear_overlay(self):
+        self._end_stroke_painter()
         if not self.overlay_pixmap.isNull():
             self.overlay_pixmap.fill(Qt.GlobalColor.transparent)
             self.update()
+        if self.marks_box is not None:
+            x0, y0, x1, y1 = self.marks_box
+            self.keep_mask[y0:y1, x0:x1] = 0
+            self.remove_mask[y0:y1, x0:x1] = 0
+            self.marks_box = None
 
     def get_overlay_pixmap(self):
         return self.overlay_pixmap.copy()
 
+    def get_masks(self):
+        """(keep, remove, box): live views of the uint8 masks cropped to the
+        marked bounding box, or (None, None, None) if nothing is marked.
+        Treat them as read-only; clear_overlay zeroes them in place."""
+        if self.marks_box is None:
+            return None, None, None
+        x0, y0, x1, y1 = self.marks_box
+        return self.keep_mask[y0:y1, x0:x1], self.remove_mask[y0:y1, x0:x1], self.marks_box
+
+    def _stamp_marks(self, img_p0, img_p1):
+        mask = self.keep_mask if self.current_mode == self.MODE_KEEP else self.remove_mask
+        if mask is None:
+            return
+        p0, p1 = (img_p0.x(), img_p0.y()), (img_p1.x(), img_p1.y())
+        box = stamp_segment(mask, p0, p1, self.brush_size)
+        if box is None:
+            return
+        if self.marks_box is not None:
+            bx0, by0, bx1, by1 = self.marks_box
+            box = (min(box[0], bx0), min(box[1], by0), max(box[2], bx1), max(box[3], by1))
+        self.marks_box = box
+
     def set_zoom(self, level):
-        self.zoom_level = max(0.05, level)
+        level = max(0.05, level)
+        # set_display_pixmap and fit_to_view re-apply the current zoom on every
+        # image update / viewport resize; only rebuild the cursor when it
+        # actually changes. update() already coalesces into a single paint.
+        zoom_changed = level != self.zoom_level
+        self.zoom_level = level
         if not self.base_pixmap.isNull():
-            self.resize(self.base_pixmap.size() * self.zoom_level)
-        self.update_cursor()
+            size = self.base_pixmap.size() * level
+            if size != self.size():
+                self.resize(size)
+        if zoom_changed:
+            self.update_cursor()
         self.update()
 
     def fit_to_view(self):
@@ -931,6 +1429,9 @@ class InteractiveLabel(QLabel):
 
     def clear_interaction_state(self):
         self.crop_rect_visual, self.drawing, self.cropping = None, False, False
+        self._stroke_timer.stop()
+        self._pending_path = None
+        self._end_stroke_painter()
         self.clear_overlay()
         self.clear_wand_selection()
         self.clear_perspective()
@@ -939,6 +1440,7 @@ class InteractiveLabel(QLabel):
         if not self.wand_preview_pixmap.isNull():
             self.wand_preview_pixmap.fill(Qt.GlobalColor.transparent)
         self.wand_selection_mask = None
+        self.wand_selection_mask_np = None
         self.update()
 
     def set_wand_preview(self, mask_pil):
@@ -947,14 +1449,16 @@ class InteractiveLabel(QLabel):
             return
         self.wand_selection_mask = mask_pil
         preview_color = QColor(0, 150, 255, 100)
-        mask_np = np.array(mask_pil)
-        color_img_np = np.zeros((mask_np.shape[0], mask_np.shape[1], 4), dtype=np.uint8)
-        color_img_np[:, :, 0] = preview_color.red()
-        color_img_np[:, :, 1] = preview_color.green()
-        color_img_np[:, :, 2] = preview_color.blue()
-        color_img_np[:, :, 3] = (mask_np / 255.0 * preview_color.alpha()).astype(np.uint8)
-        preview_pil = Image.fromarray(color_img_np, 'RGBA')
-        self.wand_preview_pixmap = pil_to_qpixmap(preview_pil)
+        mask_np = np.asarray(mask_pil)   # 1-bit '1' mask unpacks to bool
+        self.wand_selection_mask_np = mask_np   # kept so apply needn't unpack again
+        h, w = mask_np.shape
+        # One broadcast fill for the colour and a 0/1 multiply for the alpha,
+        # written straight into the QImage's own pixels (no float temporaries,
+        # no PIL round-trip, no intermediate array).
+        qimg, color_img_np = new_rgba_qimage(w, h)
+        color_img_np[:, :, :3] = (preview_color.red(), preview_color.green(), preview_color.blue())
+        np.multiply(mask_np.view(np.uint8), np.uint8(preview_color.alpha()), out=color_img_np[:, :, 3])
+        self.wand_preview_pixmap = rgba_qimage_to_qpixmap(qimg)
         self.update()
 
     # --- Perspective helpers ---
@@ -995,7 +1499,7 @@ class InteractiveLabel(QLabel):
         return view_point / self.zoom_level
 
     def set_brush_size(self, size):
-        self.brush_size = max(1, size)
+        self.brush_size = max(2, size)   # see stamp_segment
         self.update_cursor()
 
     def set_grid(self, enabled, spacing=None):
@@ -1023,11 +1527,28 @@ class InteractiveLabel(QLabel):
         painter.drawLine(w // 2, 0, w // 2, h)
         painter.drawLine(0, h // 2, w, h // 2)
 
+    def _brush_outline_active(self):
+        return (self.isEnabled() and self.current_mode in (self.MODE_KEEP, self.MODE_REMOVE)
+                and self.brush_size * self.zoom_level > MAX_CURSOR_SIZE - 4)
+
+    def _move_brush_outline(self, pos):
+        """Repaint the canvas-drawn brush outline at `pos` (None hides it)."""
+        r = int(self.brush_size * self.zoom_level / 2) + 2
+        for p in (self._brush_outline_pos, pos):
+            if p is not None:
+                self.update(QRect(p.x() - r, p.y() - r, 2 * r + 1, 2 * r + 1))
+        self._brush_outline_pos = pos
+
     def update_cursor(self):
+        if not self._brush_outline_active() and self._brush_outline_pos is not None:
+            self._move_brush_outline(None)
         if not self.isEnabled():
             return self.setCursor(Qt.CursorShape.ArrowCursor)
         cursor_size = self.brush_size * self.zoom_level
-        if self.current_mode == self.MODE_KEEP:
+        if self._brush_outline_active():
+            # The cursor pixmap can't show the real size; paintEvent does.
+            self.setCursor(Qt.CursorShape.CrossCursor)
+        elif self.current_mode == self.MODE_KEEP:
             self.setCursor(create_brush_cursor(cursor_size, QColor(0, 255, 0)))
         elif self.current_mode == self.MODE_REMOVE:
             self.setCursor(create_brush_cursor(cursor_size, QColor(255, 0, 0)))
@@ -1044,7 +1565,11 @@ class InteractiveLabel(QLabel):
         if self.current_mode in (self.MODE_KEEP, self.MODE_REMOVE):
             self.drawing = True
             self.last_point = event.pos()
+            self._begin_stroke_painter()
             self._draw_on_overlay(self.last_point, self.last_point)
+            self._last_img_point = self.map_to_image(self.last_point)
+            self._stamp_marks(self._last_img_point, self._last_img_point)
+            self._pending_path = QPainterPath(QPointF(self._last_img_point))
         elif self.current_mode == self.MODE_CROP:
             self.cropping = True
             self.crop_start_point = self.crop_end_point = event.pos()
@@ -1063,11 +1588,18 @@ class InteractiveLabel(QLabel):
             self.update()
 
     def mouseMoveEvent(self, event):
+        if self._brush_outline_active():
+            self._move_brush_outline(event.pos())
         if not self.isEnabled() or not (event.buttons() & Qt.MouseButton.LeftButton):
             return
         if self.drawing:
-            self._draw_on_overlay(self.last_point, event.pos())
             self.last_point = event.pos()
+            img_point = self.map_to_image(self.last_point)
+            self._stamp_marks(self._last_img_point, img_point)
+            self._last_img_point = img_point
+            self._pending_path.lineTo(QPointF(img_point))
+            if not self._stroke_timer.isActive():
+                self._stroke_timer.start()
         elif self.cropping:
             self.crop_end_point = event.pos()
             self.update()
@@ -1080,6 +1612,10 @@ class InteractiveLabel(QLabel):
         if not self.isEnabled() or event.button() != Qt.MouseButton.LeftButton:
             return
         if self.drawing:
+            self._stroke_timer.stop()
+            self._flush_stroke()
+            self._end_stroke_painter()
+            self._pending_path = None
             self.drawing = False
             self.stroke_committed.emit(self.overlay_pixmap)
         elif self.cropping:
@@ -1089,21 +1625,67 @@ class InteractiveLabel(QLabel):
         elif self.current_mode == self.MODE_PERSPECTIVE:
             self._perspective_drag_index = None
 
+    def _stroke_pen(self):
+        color = QColor(0, 255, 0, 180) if self.current_mode == self.MODE_KEEP else QColor(255, 0, 0, 180)
+        return QPen(color, self.brush_size, Qt.PenStyle.SolidLine,
+                    Qt.PenCapStyle.RoundCap, Qt.PenJoinStyle.RoundJoin)
+
+    def _begin_stroke_painter(self):
+        """Open one painter on the overlay for the whole press-drag-release."""
+        self._end_stroke_painter()
+        if self.overlay_pixmap.isNull():
+            return
+        self._stroke_painter = QPainter(self.overlay_pixmap)
+        self._stroke_painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        self._stroke_painter.setPen(self._stroke_pen())
+
+    def _end_stroke_painter(self):
+        if self._stroke_painter is not None:
+            self._stroke_painter.end()
+            self._stroke_painter = None
+
+    def _flush_stroke(self):
+        """Paint the segments gathered since the last flush in one drawPath."""
+        path = self._pending_path
+        if path is None or path.elementCount() < 2 or self.overlay_pixmap.isNull():
+            return
+        if self._stroke_painter is not None:
+            self._stroke_painter.drawPath(path)
+        else:
+            painter = QPainter(self.overlay_pixmap)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            painter.setPen(self._stroke_pen())
+            painter.drawPath(path)
+            painter.end()
+        self._pending_path = QPainterPath(path.currentPosition())
+        box = path.boundingRect()
+        self._update_stroke_area(box.left(), box.top(), box.right(), box.bottom())
+
+    def _update_stroke_area(self, x0, y0, x1, y1):
+        """Repaint just the view area of the image-space box (x0, y0)-(x1, y1)
+        grown by the brush radius, not the whole (often huge) zoomed widget."""
+        z = self.zoom_level
+        pad = self.brush_size / 2 + 2   # pen radius plus antialiasing / rounding
+        left, top = int((min(x0, x1) - pad) * z) - 1, int((min(y0, y1) - pad) * z) - 1
+        right, bottom = int((max(x0, x1) + pad) * z) + 2, int((max(y0, y1) + pad) * z) + 2
+        self.update(QRect(left, top, right - left, bottom - top))
+
     def _draw_on_overlay(self, start_point, end_point):
-        painter = QPainter(self.overlay_pixmap)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter = self._stroke_painter
+        if painter is None:
+            painter = QPainter(self.overlay_pixmap)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            painter.setPen(self._stroke_pen())
         start_img_point = self.map_to_image(start_point)
         end_img_point = self.map_to_image(end_point)
-        color = QColor(0, 255, 0, 180) if self.current_mode == self.MODE_KEEP else QColor(255, 0, 0, 180)
-        pen = QPen(color, self.brush_size, Qt.PenStyle.SolidLine,
-                   Qt.PenCapStyle.RoundCap, Qt.PenJoinStyle.RoundJoin)
-        painter.setPen(pen)
         if start_point == end_point:
             painter.drawPoint(start_img_point)
         else:
             painter.drawLine(start_img_point, end_img_point)
-        painter.end()
-        self.update()
+        if painter is not self._stroke_painter:
+            painter.end()
+        self._update_stroke_area(start_img_point.x(), start_img_point.y(),
+                                 end_img_point.x(), end_img_point.y())
 
     def _draw_perspective(self, painter):
         if not self.perspective_points:
@@ -1145,6 +1727,14 @@ class InteractiveLabel(QLabel):
 
         painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
         target_rect = self.rect()
+        exposed = event.rect().intersected(target_rect)
+        if self.backdrop_color is not None:
+            painter.fillRect(exposed, self.backdrop_color)
+        else:
+            # Cells keep a fixed size in image pixels. The tile is rendered at
+            # the on-screen cell size: a scaled texture brush is ~15x slower.
+            cell = max(1, round(40 * self.zoom_level))
+            painter.fillRect(exposed, QBrush(create_checkerboard_tile(cell)))
         painter.drawPixmap(target_rect, self.base_pixmap, self.base_pixmap.rect())
         if not self.overlay_pixmap.isNull():
             painter.drawPixmap(target_rect, self.overlay_pixmap, self.overlay_pixmap.rect())
@@ -1161,6 +1751,21 @@ class InteractiveLabel(QLabel):
             self._draw_grid(painter)
         if self.current_mode == self.MODE_PERSPECTIVE or self.perspective_points:
             self._draw_perspective(painter)
+        if self._brush_outline_pos is not None:
+            self._draw_brush_outline(painter)
+
+    def _draw_brush_outline(self, painter):
+        color = QColor(0, 255, 0, 100) if self.current_mode == self.MODE_KEEP else QColor(255, 0, 0, 100)
+        r = self.brush_size * self.zoom_level / 2.0
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(QColor(0, 0, 0))
+        painter.setBrush(color)
+        painter.drawEllipse(QPointF(self._brush_outline_pos), r, r)
+
+    def leaveEvent(self, event):
+        if self._brush_outline_pos is not None:
+            self._move_brush_outline(None)
+        super().leaveEvent(event)
 
 
 # ======================================================================
@@ -1318,8 +1923,9 @@ class CompositorCanvas(QWidget):
         bw, bh = self.base_size.width(), self.base_size.height()
         dw, dh = int(bw * disp), int(bh * disp)
 
-        # checkerboard behind, then composed image
-        painter.drawPixmap(int(ox), int(oy), create_checkerboard(dw, dh))
+        # checkerboard behind (anchored to the page corner), then composed image
+        painter.setBrushOrigin(int(ox), int(oy))
+        painter.fillRect(int(ox), int(oy), dw, dh, QBrush(create_checkerboard_tile()))
         try:
             composed = self.dialog._compose(scale=disp)
             painter.drawPixmap(int(ox), int(oy), pil_to_qpixmap(composed))
@@ -2174,16 +2780,21 @@ class BatchWorker(QThread):
     """Remove backgrounds (and optionally upscale) for a list of files,
     saving each result as a PNG into an output folder."""
     progress = Signal(int, int, str)     # index, total, message
+    error = Signal(str)                  # a failed file (or model load)
     finished_all = Signal(int, int)      # succeeded, failed
 
     def __init__(self, files, out_dir, model, matting, providers,
-                 upscale_model=None, upscale_scale=2, parent=None):
+                 upscale_model=None, upscale_scale=2, precision="FP32",
+                 get_session=None, parent=None):
         super().__init__(parent)
+        # get_session(model, providers, precision); defaults to a fresh session.
+        self.get_session = get_session or new_rembg_session
         self.files = files
         self.out_dir = out_dir
         self.model = model
         self.matting = matting
         self.providers = providers
+        self.precision = precision
         self.upscale_model = upscale_model
         self.upscale_scale = upscale_scale
         self._cancel = False
@@ -2195,11 +2806,10 @@ class BatchWorker(QThread):
         ok = fail = 0
         session = None
         try:
-            from rembg import new_session
-            session = (new_session(self.model, providers=self.providers)
-                       if self.providers else new_session(self.model))
+            session = self.get_session(self.model, self.providers, self.precision)
         except Exception as e:
-            print(f"Batch: could not create session ({e}); using per-call model.")
+            # Report it, then let each file retry the load and fail on its own.
+            self.error.emit(f"Could not load model {self.model}: {e}")
         total = len(self.files)
         for i, path in enumerate(self.files, 1):
             if self._cancel:
@@ -2208,12 +2818,9 @@ class BatchWorker(QThread):
             self.progress.emit(i, total, f"Processing {name}…")
             try:
                 img = Image.open(path).convert("RGBA")
-                if session is not None:
-                    result = remove_bg(img, session=session, alpha_matting=self.matting)
-                else:
-                    result = remove_bg(img, model=self.model, alpha_matting=self.matting)
-                if not isinstance(result, Image.Image):
-                    result = Image.open(io.BytesIO(result)).convert("RGBA")
+                if session is None:
+                    session = self.get_session(self.model, self.providers, self.precision)
+                result = rembg_cutout(img, session, alpha_matting=self.matting)
                 if self.upscale_model is not None:
                     result = upscale_image(result, scale=self.upscale_scale,
                                            model=self.upscale_model, use_ai=True)
@@ -2222,7 +2829,7 @@ class BatchWorker(QThread):
                 result.save(out_path)
                 ok += 1
             except Exception as e:
-                print(f"Batch failed for {name}: {e}")
+                self.error.emit(f"{name}: {e}")
                 fail += 1
         self.finished_all.emit(ok, fail)
 
@@ -2238,6 +2845,7 @@ class BatchProcessDialog(QDialog):
         self.files = []
         self.out_dir = ""
         self.worker = None
+        self.errors = []
 
         lay = QVBoxLayout(self)
 
@@ -2335,20 +2943,27 @@ class BatchProcessDialog(QDialog):
         if not self.out_dir:
             QMessageBox.information(self, "Batch", "Choose an output folder.")
             return
-        providers = None
+        providers, precision = None, "FP32"
         if self.main is not None:
             use_gpu = self.main.settings.value("gpu_acceleration", True, type=bool)
             providers = preferred_ort_providers(use_gpu)
+            precision = self.main.settings.value("rembg_precision", "FP32", type=str)
         up_model = self.combo_up_model.currentData() if self.cb_upscale.isChecked() else None
         up_scale = int(self.combo_up_scale.currentText().replace("×", ""))
         self.bar.setVisible(True)
         self.bar.setRange(0, len(self.files))
         self.btn_start.setEnabled(False)
+        self.errors = []
         self.worker = BatchWorker(list(self.files), self.out_dir,
                                   self.combo_model.currentText(),
                                   self.cb_matting.isChecked(), providers,
-                                  upscale_model=up_model, upscale_scale=up_scale)
+                                  upscale_model=up_model, upscale_scale=up_scale,
+                                  precision=precision,
+                                  # Share the main window's (possibly
+                                  # prewarmed) session instead of a second copy.
+                                  get_session=self.main.get_rembg_session if self.main else None)
         self.worker.progress.connect(self._on_progress)
+        self.worker.error.connect(self._on_error)
         self.worker.finished_all.connect(self._on_done)
         self.worker.start()
 
@@ -2356,12 +2971,20 @@ class BatchProcessDialog(QDialog):
         self.bar.setValue(i)
         self.status.setText(msg)
 
+    def _on_error(self, msg):
+        print(f"Batch: {msg}")
+        self.errors.append(msg)
+
     def _on_done(self, ok, fail):
         self.btn_start.setEnabled(True)
         self.status.setText(f"Done. {ok} succeeded, {fail} failed.")
-        QMessageBox.information(self, "Batch Complete",
-                                f"Processed {ok + fail} image(s).\n"
-                                f"{ok} succeeded, {fail} failed.\n\nSaved to:\n{self.out_dir}")
+        text = (f"Processed {ok + fail} image(s).\n"
+                f"{ok} succeeded, {fail} failed.\n\nSaved to:\n{self.out_dir}")
+        if self.errors:
+            shown = self.errors[:5]
+            more = len(self.errors) - len(shown)
+            text += "\n\nErrors:\n" + "\n".join(shown) + (f"\n…and {more} more" if more else "")
+        QMessageBox.information(self, "Batch Complete", text)
 
     def closeEvent(self, event):
         if self.worker and self.worker.isRunning():
@@ -2400,6 +3023,9 @@ class PreferencesDialog(QDialog):
         self.cb_gpu = QCheckBox("Use hardware acceleration (GPU / CoreML) when available")
         self.cb_gpu.setChecked(self.settings.value("gpu_acceleration", True, type=bool))
 
+        self.combo_precision = QComboBox(); self.combo_precision.addItems(REMBG_PRECISIONS)
+        self.combo_precision.setCurrentText(self.settings.value("rembg_precision", "FP32", type=str))
+
         self.cb_update = QCheckBox("Check for updates on startup")
         self.cb_update.setChecked(self.settings.value("check_updates", False, type=bool))
 
@@ -2407,11 +3033,14 @@ class PreferencesDialog(QDialog):
         form.addRow("Default save format:", self.combo_format)
         form.addRow("JPEG/WebP/AVIF quality:", self.spin_quality)
         form.addRow(self.cb_gpu)
+        form.addRow("AI model precision:", self.combo_precision)
         form.addRow(self.cb_update)
         lay.addLayout(form)
 
         note = QLabel("Hardware acceleration needs the matching onnxruntime build "
-                      "(e.g. onnxruntime-gpu on CUDA, or onnxruntime-silicon / CoreML on macOS).")
+                      "(e.g. onnxruntime-gpu on CUDA, or onnxruntime-silicon / CoreML on macOS). "
+                      "FP16 / INT8 use model copies made with tools/quantize_rembg.py; models "
+                      "without one keep using FP32. INT8 is fastest on CPU, FP16 on GPU.")
         note.setWordWrap(True)
         note.setStyleSheet("color:#889; font-size:10px;")
         lay.addWidget(note)
@@ -2427,6 +3056,7 @@ class PreferencesDialog(QDialog):
         self.settings.setValue("default_format", self.combo_format.currentText())
         self.settings.setValue("save_quality", self.spin_quality.value())
         self.settings.setValue("gpu_acceleration", self.cb_gpu.isChecked())
+        self.settings.setValue("rembg_precision", self.combo_precision.currentText())
         self.settings.setValue("check_updates", self.cb_update.isChecked())
         self.accept()
 
@@ -2436,7 +3066,10 @@ class PreferencesDialog(QDialog):
 # ======================================================================
 
 class MainWindow(QMainWindow):
-    MAX_HISTORY = 20
+    MAX_HISTORY = 50
+    HOT_HISTORY = 2     # newest undo states kept as live PIL images
+    KEYFRAME_INTERVAL = 10   # longest delta chain, keyframe included
+    WAND_PREVIEW_PIXELS = 4_000_000   # larger images get a subsampled wand preview
 
     def __init__(self):
         super().__init__()
@@ -2444,7 +3077,8 @@ class MainWindow(QMainWindow):
         self.settings = QSettings(APP_ORG, APP_NAME)
         self.recent_files = self.settings.value("recent_files", [], type=list) or []
         self.current_theme = self.settings.value("theme", "light", type=str)
-        self._rembg_sessions = {}       # model_name -> cached rembg session
+        self._rembg_sessions = {}       # _rembg_session_key(...) -> cached rembg session
+        self._rembg_session_lock = QMutex()   # one build per model across threads
 
         self.setWindowTitle(f"{APP_NAME} — {APP_TAGLINE}")
         self.setWindowIcon(get_app_icon())
@@ -2453,12 +3087,31 @@ class MainWindow(QMainWindow):
         # size to whatever the current screen can actually show.
         self.setMinimumSize(900, 600)
         self.temp_files_to_clean = []
+        # One PNG per process backs every Copy; it is overwritten each time.
+        self._clipboard_temp_path = os.path.join(tempfile.gettempdir(), f"bgremover_clip_{os.getpid()}.png")
+        QTimer.singleShot(0, self._remove_stale_clipboard_files)
+        QTimer.singleShot(0, self._warm_up_wand_kernel)
 
         self.original_pil_image, self.current_pil_image = None, None
         self.original_qpixmap, self.current_qpixmap = None, None
         self.background_color = None
 
         self.undo_stack, self.redo_stack = [], []
+        self._geometry_changed = False  # see _set_current_image
+        # id(pil_image) -> (pil_image, QPixmap). Holding the image keeps its id
+        # from being recycled while the entry is cached.
+        self._pixmap_cache = collections.OrderedDict()
+        # id(pil_image) -> [pil_image, rgb, (preview rgb, step) or None] for the
+        # Magic Wand; a couple of entries so undo/redo while tuning still hit.
+        self._wand_sources = collections.OrderedDict()
+        self._wand_seed = None          # (x, y, tolerance) of a subsampled preview
+        self._scratch = ScratchPool()   # work buffers for wand / colour ops
+        # Probing the clipboard is an IPC round-trip on most platforms, so its
+        # "has an image" state is cached and refreshed only when it changes.
+        self._clipboard_has_image = False
+        # Last value applied per enable predicate; widgets are only touched
+        # when it flips, so routine refreshes don't restyle the whole panel.
+        self._enable_cache = {}
 
         self.rembg_model = self.settings.value("rembg_model", "u2net", type=str)
         self.alpha_matting_enabled = False
@@ -2467,6 +3120,8 @@ class MainWindow(QMainWindow):
         self.selected_color_rgb = None
         self.preview_angle = 0.0        # live (unbaked) rotation angle, degrees CW
         self._active_workers = []       # background OperationWorker threads
+        self._warmup_workers = set()    # of those, the ones that can't be cancelled
+        self._rembg_worker = None       # in-flight AI removal (may outlive a Cancel)
         self.setAcceptDrops(True)
 
         self._create_widgets()
@@ -2485,8 +3140,8 @@ class MainWindow(QMainWindow):
         elif geo is None:
             self._apply_initial_geometry(preferred=(1440, 900))
 
-        QApplication.clipboard().dataChanged.connect(self._update_ui_states)
-        self._update_ui_states()
+        QApplication.clipboard().dataChanged.connect(self._on_clipboard_changed)
+        self._on_clipboard_changed()
 
     def _restore_ui_settings(self):
         """Push persisted preferences into the freshly-built widgets."""
@@ -2600,11 +3255,18 @@ class MainWindow(QMainWindow):
                                         toolTip="Show keyboard shortcuts")
         self.action_update = QAction("Check for Updates…", self,
                                      toolTip="Check GitHub for a newer version")
+        # Actions that are enabled exactly when an image is loaded.
+        self._has_image_group = QActionGroup(self)
+        self._has_image_group.setExclusive(False)
+        for act in (self.action_save, self.action_export_pdf, self.action_copy,
+                    self.action_reset, self.action_overlay, self.action_page_bg):
+            self._has_image_group.addAction(act)
 
     def _create_menu_bar(self):
         menubar = self.menuBar()
         m_file = menubar.addMenu("&File")
         m_file.addActions([self.action_open, self.action_paste])
+        m_file.aboutToShow.connect(self._on_clipboard_changed)
         self.menu_recent = m_file.addMenu("Open &Recent")
         self._rebuild_recent_menu()
         m_file.addSeparator()
@@ -2824,7 +3486,7 @@ class MainWindow(QMainWindow):
         self.btn_mode_remove = QPushButton("Mark Remove"); self.btn_mode_remove.setCheckable(True)
         mask_mode_layout = QHBoxLayout(); mask_mode_layout.addWidget(self.btn_mode_keep); mask_mode_layout.addWidget(self.btn_mode_remove)
         tl.addLayout(mask_mode_layout)
-        self.brush_slider = QSlider(Qt.Orientation.Horizontal); self.brush_slider.setRange(1, 200); self.brush_slider.setValue(self.brush_size)
+        self.brush_slider = QSlider(Qt.Orientation.Horizontal); self.brush_slider.setRange(2, 200); self.brush_slider.setValue(self.brush_size)
         self.brush_size_label_value = QLabel(f"{self.brush_size}px")
         brush_layout = QHBoxLayout(); brush_layout.addWidget(QLabel("Brush:")); brush_layout.addWidget(self.brush_slider); brush_layout.addWidget(self.brush_size_label_value)
         tl.addLayout(brush_layout)
@@ -2835,8 +3497,8 @@ class MainWindow(QMainWindow):
         magic_wand_group = QGroupBox("Magic Wand")
         ml = QVBoxLayout(magic_wand_group)
         self.btn_magic_wand = QPushButton("Magic Wand Select"); self.btn_magic_wand.setCheckable(True)
-        if not SCIPY_AVAILABLE:
-            self.btn_magic_wand.setToolTip("Disabled: 'scipy' not found (pip install scipy)")
+        if not WAND_AVAILABLE:
+            self.btn_magic_wand.setToolTip("Disabled: needs 'scipy' or 'numba' (pip install scipy)")
         self.wand_tolerance_spin = QSpinBox(); self.wand_tolerance_spin.setRange(0, 255); self.wand_tolerance_spin.setValue(20)
         wand_tolerance_layout = QHBoxLayout(); wand_tolerance_layout.addWidget(QLabel("Tolerance:")); wand_tolerance_layout.addWidget(self.wand_tolerance_spin)
         self.btn_apply_wand_remove = QPushButton("Remove Selected Area")
@@ -3034,6 +3696,7 @@ class MainWindow(QMainWindow):
         self.btn_open_models.clicked.connect(
             lambda: QDesktopServices.openUrl(QUrl.fromLocalFile(MODELS_DIR)))
         self.model_combo.currentTextChanged.connect(lambda m: setattr(self, 'rembg_model', m))
+        self.model_combo.currentTextChanged.connect(self._prewarm_rembg_session)
         self.cb_alpha_matting.stateChanged.connect(lambda s: (setattr(self, 'alpha_matting_enabled', bool(s)), self._update_ui_states()))
         self.btn_mode_crop.clicked.connect(lambda: self.set_interaction_mode(InteractiveLabel.MODE_CROP))
         self.btn_apply_crop.clicked.connect(self.apply_crop)
@@ -3082,6 +3745,7 @@ class MainWindow(QMainWindow):
     # ---- display helpers ----
     def _show_original_image_fast(self):
         if self.original_qpixmap:
+            self.image_label_preview.set_backdrop(None)
             self.image_label_preview.set_display_pixmap(self.original_qpixmap)
 
     def _show_current_image_display(self):
@@ -3092,37 +3756,105 @@ class MainWindow(QMainWindow):
         self.image_label_preview.set_brush_size(self.brush_size)
         self.brush_size_label_value.setText(f"{value}px")
 
+    def _pixmap_for(self, pil_image):
+        """QPixmap for `pil_image`, reusing the last conversion of that exact
+        object so undo/redo back to an already-shown state skips the copy."""
+        if pil_image is None:
+            return QPixmap()
+        key = id(pil_image)
+        hit = self._pixmap_cache.get(key)
+        if hit is not None and hit[0] is pil_image:
+            self._pixmap_cache.move_to_end(key)
+            return hit[1]
+        pixmap = pil_to_qpixmap(pil_image)
+        self._pixmap_cache[key] = (pil_image, pixmap)
+        while len(self._pixmap_cache) > self.HOT_HISTORY + 2:
+            self._pixmap_cache.popitem(last=False)
+        return pixmap
+
     def _push_state(self, pil_image, description=""):
         if pil_image is None:
             return
         if len(self.undo_stack) >= self.MAX_HISTORY:
             self.undo_stack.pop(0)
-        self.undo_stack.append({"image": pil_image.copy(), "desc": description, "bg_color": self.background_color})
+        # Live images are never modified in place (operations get their own
+        # copy), so history can share the reference instead of copying.
+        self.undo_stack.append({"image": pil_image, "desc": description,
+                                "bg_color": self.background_color,
+                                "geometry_changed": self._geometry_changed})
         self.redo_stack.clear()
+        self._freeze_cold_states()
         self._update_ui_states()
 
+    def _freeze_cold_states(self):
+        """Compress every history entry except those nearest the current
+        state, which stay as PIL images so a typical undo/redo is free.
+
+        Cold undo entries are stored as a delta against the next newer entry
+        (kept alive through "base"), with a full keyframe after at most
+        KEYFRAME_INTERVAL - 1 deltas in a row to bound the chain walked on
+        undo. Redo entries are always stored whole.
+        """
+        cold_undo = self.undo_stack[:-self.HOT_HISTORY]
+        # Oldest first: `run` counts the deltas directly before the entry,
+        # which all decode through it, and the base is usually still hot.
+        run = 0
+        for i, state in enumerate(cold_undo):
+            if "image" in state:
+                image = state.pop("image")
+                if run >= self.KEYFRAME_INTERVAL - 1:
+                    state["packed"] = pack_image(image)
+                else:
+                    base_state = self.undo_stack[i + 1]
+                    state["packed"] = pack_image(image, self._decode_state(base_state))
+                    if state["packed"]["delta"]:
+                        state["base"] = base_state
+            run = run + 1 if state["packed"]["delta"] else 0
+        for state in self.redo_stack[:-1]:
+            image = state.pop("image", None)
+            if image is not None:
+                state["packed"] = pack_image(image)
+
+    def _decode_state(self, state):
+        """The state's PIL image, rebuilt through its delta chain if frozen."""
+        if "image" in state:
+            return state["image"]
+        base_state = state.get("base")
+        base = self._decode_state(base_state) if base_state is not None else None
+        return unpack_image(state["packed"], base)
+
+    def _state_image(self, state):
+        """The state's PIL image, decompressing (and keeping) it if frozen."""
+        if "image" not in state:
+            state["image"] = self._decode_state(state)
+            state.pop("packed")
+            state.pop("base", None)
+        return state["image"]
+
     def _load_new_image(self, pil_image, source_desc="Loaded"):
-        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
-        try:
-            self.original_pil_image = pil_image.convert('RGBA')
-            self.current_pil_image = self.original_pil_image.copy()
-            self.original_qpixmap = pil_to_qpixmap(self.original_pil_image)
-            self.current_qpixmap = self.original_qpixmap.copy()
-            self.background_color = None
-            self.undo_stack, self.redo_stack = [], []
-            self.image_label_preview.clear_interaction_state()
-            self._reset_angle_controls(refresh=False)
-            self._push_state(self.current_pil_image, "Initial Load")
-            self._update_display()
-            self.image_label_preview.fit_to_view()
-            self.statusBar.showMessage(f"{source_desc} successfully.", 5000)
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to process loaded image: {e}")
-            self._clear_workspace()
-        finally:
-            QApplication.restoreOverrideCursor()
-            self._update_ui_states()
-            self.set_interaction_mode(InteractiveLabel.MODE_NONE, force_off=True)
+        with wait_cursor():
+            try:
+                self.original_pil_image = pil_image.convert('RGBA')
+                self.current_pil_image = self.original_pil_image
+                self._reset_wand_source()
+                self._pixmap_cache.clear()
+                self.original_qpixmap = self._pixmap_for(self.original_pil_image)
+                self.current_qpixmap = self.original_qpixmap.copy()
+                self.background_color = None
+                self.undo_stack, self.redo_stack = [], []
+                self._geometry_changed = False
+                self.image_label_preview.clear_interaction_state()
+                self._reset_angle_controls(refresh=False)
+                self._push_state(self.current_pil_image, "Initial Load")
+                self._update_display()
+                self.image_label_preview.fit_to_view()
+                self.statusBar.showMessage(f"{source_desc} successfully.", 5000)
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Failed to process loaded image: {e}")
+                self._clear_workspace()
+            finally:
+                self._update_ui_states()
+                self.set_interaction_mode(InteractiveLabel.MODE_NONE, force_off=True)
 
     def _update_display(self):
         if not self.current_qpixmap:
@@ -3136,29 +3868,31 @@ class MainWindow(QMainWindow):
             content = self.current_qpixmap.transformed(
                 transform, Qt.TransformationMode.SmoothTransformation)
 
-        base = QPixmap(content.size())
-        base.fill(self.background_color if self.background_color else Qt.GlobalColor.transparent)
-        painter = QPainter(base)
-        if not self.background_color:
-            checkerboard = create_checkerboard(base.width(), base.height())
-            painter.drawPixmap(0, 0, checkerboard)
-        painter.drawPixmap(0, 0, content)
-        painter.end()
-        self.image_label_preview.set_display_pixmap(base)
+        # The label paints the backdrop itself, so the image pixmap is shown as-is.
+        self.image_label_preview.set_backdrop(self.background_color)
+        self.image_label_preview.set_display_pixmap(content)
 
     def _clear_workspace(self):
         self.original_pil_image, self.current_pil_image = None, None
         self.original_qpixmap, self.current_qpixmap = None, None
         self.background_color = None
         self.undo_stack, self.redo_stack = [], []
+        self._geometry_changed = False
+        self._pixmap_cache.clear()
+        self._reset_wand_source()
         self._update_display()
         self.statusBar.showMessage("Workspace cleared. Load or paste an image.")
         self._update_ui_states()
 
-    def _set_current_image(self, pil_image, description):
+    def _set_current_image(self, pil_image, description, transform=False):
+        """Make `pil_image` current, recording the old one for undo. Pass
+        `transform` for edits that move pixels (crop, rotate, warp, resize),
+        after which the original no longer lines up with the current image."""
         self._push_state(self.current_pil_image, description)
         self.current_pil_image = pil_image
-        self.current_qpixmap = pil_to_qpixmap(self.current_pil_image)
+        self._geometry_changed = self._geometry_changed or transform
+        self._wand_seed = None
+        self.current_qpixmap = self._pixmap_for(self.current_pil_image)
         self._update_display()
 
     def undo_state(self):
@@ -3166,8 +3900,11 @@ class MainWindow(QMainWindow):
             return
         self.redo_stack.append(self.undo_stack.pop())
         last_state = self.undo_stack[-1]
-        self.current_pil_image = last_state["image"]
-        self.current_qpixmap = pil_to_qpixmap(self.current_pil_image)
+        self.current_pil_image = self._state_image(last_state)
+        self._geometry_changed = last_state["geometry_changed"]
+        self._freeze_cold_states()
+        self._wand_seed = None
+        self.current_qpixmap = self._pixmap_for(self.current_pil_image)
         self.background_color = last_state["bg_color"]
         self.image_label_preview.clear_interaction_state()
         self._reset_angle_controls(refresh=False)
@@ -3180,8 +3917,11 @@ class MainWindow(QMainWindow):
             return
         next_state = self.redo_stack.pop()
         self.undo_stack.append(next_state)
-        self.current_pil_image = next_state["image"]
-        self.current_qpixmap = pil_to_qpixmap(self.current_pil_image)
+        self.current_pil_image = self._state_image(next_state)
+        self._geometry_changed = next_state["geometry_changed"]
+        self._freeze_cold_states()
+        self._wand_seed = None
+        self.current_qpixmap = self._pixmap_for(self.current_pil_image)
         self.background_color = next_state["bg_color"]
         self.image_label_preview.clear_interaction_state()
         self._reset_angle_controls(refresh=False)
@@ -3189,7 +3929,8 @@ class MainWindow(QMainWindow):
         self.statusBar.showMessage("Redo: Restored state", 3000)
         self._update_ui_states()
 
-    def _perform_operation(self, operation_func, pre_op_desc, progress_title="Processing…"):
+    def _perform_operation(self, operation_func, pre_op_desc, progress_title="Processing…",
+                           transform=False):
         if not self.current_pil_image:
             return
         progress = QProgressDialog(progress_title, None, 0, 0, self)
@@ -3198,8 +3939,10 @@ class MainWindow(QMainWindow):
         progress.show()
         QApplication.processEvents()
         try:
-            result_pil = operation_func(self.current_pil_image.copy())
-            self._set_current_image(result_pil, pre_op_desc.replace("Before ", ""))
+            # Operations return a new image and never modify their input
+            # (history shares it), so the live image is passed uncopied.
+            result_pil = operation_func(self.current_pil_image)
+            self._set_current_image(result_pil, pre_op_desc.replace("Before ", ""), transform)
             self.statusBar.showMessage(f"{pre_op_desc.replace('Before ', '')} applied.", 5000)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Operation failed: {e}")
@@ -3209,29 +3952,36 @@ class MainWindow(QMainWindow):
             self._update_ui_states()
             self.set_interaction_mode(InteractiveLabel.MODE_NONE, force_off=True)
 
+    def _on_clipboard_changed(self):
+        clip = QApplication.clipboard().mimeData()
+        self._clipboard_has_image = bool(clip) and clip.hasImage()
+        self._update_ui_states()
+
     def _update_ui_states(self):
         has_image = self.current_pil_image is not None
         is_rgba = has_image and self.current_pil_image.mode == 'RGBA'
 
-        magic_wand_enabled = has_image and SCIPY_AVAILABLE
+        magic_wand_enabled = has_image and WAND_AVAILABLE
         self.btn_magic_wand.setEnabled(magic_wand_enabled)
 
-        main_actions = [self.action_save, self.action_export_pdf, self.action_copy,
-                        self.action_reset, self.action_overlay, self.action_page_bg, self.btn_rembg,
-                        self.btn_mode_crop, self.btn_apply_crop, self.btn_mode_keep,
-                        self.btn_mode_remove, self.btn_select_color, self.btn_apply_color_remove,
-                        self.btn_apply_mask, self.btn_show_original,
-                        self.angle_slider, self.angle_spin, self.btn_apply_rotation,
-                        self.btn_angle_reset, self.chk_grid, self.grid_spin,
-                        self.btn_open_compositor, self.btn_open_pagebg, self.btn_export_pdf2,
-                        self.btn_export_svg, self.btn_sharpen, self.btn_upscale,
-                        self.slider_sharpen, self.combo_upscale, self.combo_upscale_method]
-        for action in main_actions:
-            action.setEnabled(has_image)
+        if self._enable_cache.get("has_image") != has_image:
+            self._enable_cache["has_image"] = has_image
+            self._has_image_group.setEnabled(has_image)
+            for widget in (self.btn_mode_crop, self.btn_apply_crop, self.btn_mode_keep,
+                           self.btn_mode_remove, self.btn_select_color,
+                           self.btn_apply_mask, self.btn_show_original,
+                           self.angle_slider, self.angle_spin, self.btn_apply_rotation,
+                           self.btn_angle_reset, self.chk_grid, self.grid_spin,
+                           self.btn_open_compositor, self.btn_open_pagebg, self.btn_export_pdf2,
+                           self.btn_export_svg, self.btn_sharpen, self.btn_upscale,
+                           self.slider_sharpen, self.combo_upscale, self.combo_upscale_method):
+                widget.setEnabled(has_image)
 
         if not REMBG_AVAILABLE:
             self.btn_rembg.setEnabled(False)
             self.btn_rembg.setText("  rembg not installed")
+        else:
+            self.btn_rembg.setEnabled(has_image and self._rembg_worker is None)
 
         self.btn_fill_bg.setEnabled(is_rgba)
         self.btn_remove_fill.setEnabled(is_rgba and self.background_color is not None)
@@ -3251,8 +4001,7 @@ class MainWindow(QMainWindow):
 
         self.action_undo.setEnabled(len(self.undo_stack) > 1)
         self.action_redo.setEnabled(bool(self.redo_stack))
-        clip = QApplication.clipboard().mimeData()
-        self.action_paste.setEnabled(bool(clip) and clip.hasImage())
+        self.action_paste.setEnabled(self._clipboard_has_image)
 
         is_matting = self.cb_alpha_matting.isChecked()
         for spin in (self.spin_fg_thresh, self.spin_bg_thresh, self.spin_erode_size):
@@ -3272,6 +4021,8 @@ class MainWindow(QMainWindow):
             for mode, btn in self.mode_buttons.items():
                 if mode != mode_to_set:
                     btn.setChecked(False)
+        if current_mode == InteractiveLabel.MODE_WAND:
+            self._wand_preview_source()   # convert once up front, not on the first click
         self.image_label_preview.set_mode(current_mode)
 
     # ---- file operations ----
@@ -3318,6 +4069,17 @@ class MainWindow(QMainWindow):
         self._rebuild_recent_menu()
 
     def paste_image(self):
+        # Inline PNG (what Copy puts there) decodes straight into PIL with its
+        # alpha intact, skipping the QImage decode and qimage_to_pil copy.
+        mime = QApplication.clipboard().mimeData()
+        if mime is not None and mime.hasFormat("image/png"):
+            try:
+                pasted = Image.open(io.BytesIO(bytes(mime.data("image/png"))))
+                pasted.load()
+                self._load_new_image(pasted, "Pasted from clipboard")
+                return
+            except Exception as e:
+                print(f"Could not decode clipboard PNG ({e}); trying the image data.")
         qimage = QApplication.clipboard().image()
         if not qimage.isNull():
             self._load_new_image(qimage_to_pil(qimage), "Pasted from clipboard")
@@ -3328,7 +4090,8 @@ class MainWindow(QMainWindow):
         if self.original_pil_image:
             self.background_color = None
             self._reset_angle_controls(refresh=False)
-            self._set_current_image(self.original_pil_image.copy(), "Reset")
+            self._set_current_image(self.original_pil_image, "Reset")
+            self._geometry_changed = False
             self.image_label_preview.fit_to_view()
             self.statusBar.showMessage("Image reset to original.", 3000)
             self._update_ui_states()
@@ -3342,34 +4105,33 @@ class MainWindow(QMainWindow):
             "PNG (*.png);;JPG (*.jpg);;TIFF (*.tiff);;WebP (*.webp);;AVIF (*.avif)")
         if not path:
             return
-        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
-        try:
-            image_to_save = self.current_pil_image.copy()
-            if self.background_color:
-                image_to_save = flatten_image(image_to_save, self.background_color.getRgb()[:3])
-            lower = path.lower()
-            # Formats without alpha need a flattened (opaque) image.
-            if lower.endswith(('.jpg', '.jpeg')) and image_to_save.mode == 'RGBA':
-                image_to_save = flatten_image(image_to_save, (255, 255, 255))
-            save_kwargs = {}
-            quality = self.settings.value("save_quality", 92, type=int)
-            if lower.endswith(('.jpg', '.jpeg', '.webp', '.avif')):
-                save_kwargs["quality"] = quality
+        with wait_cursor():
             try:
-                image_to_save.save(path, **save_kwargs)
-            except (KeyError, OSError) as fmt_err:
-                if lower.endswith('.avif'):
-                    QMessageBox.warning(self, "AVIF unavailable",
-                        "Saving AVIF needs the 'pillow-avif-plugin' package.\n"
-                        "Install it with:  pip install pillow-avif-plugin\n\n"
-                        f"({fmt_err})")
-                    return
-                raise
-            self.statusBar.showMessage(f"Image saved to {path}", 5000)
-        except Exception as e:
-            QMessageBox.critical(self, "Save Error", f"Failed to save image: {e}")
-        finally:
-            QApplication.restoreOverrideCursor()
+                # Saving never mutates the image; flattening builds a new one.
+                image_to_save = self.current_pil_image
+                if self.background_color:
+                    image_to_save = flatten_image(image_to_save, self.background_color.getRgb()[:3])
+                lower = path.lower()
+                # Formats without alpha need a flattened (opaque) image.
+                if lower.endswith(('.jpg', '.jpeg')) and image_to_save.mode == 'RGBA':
+                    image_to_save = flatten_image(image_to_save, (255, 255, 255))
+                save_kwargs = {}
+                quality = self.settings.value("save_quality", 92, type=int)
+                if lower.endswith(('.jpg', '.jpeg', '.webp', '.avif')):
+                    save_kwargs["quality"] = quality
+                try:
+                    image_to_save.save(path, **save_kwargs)
+                except (KeyError, OSError) as fmt_err:
+                    if lower.endswith('.avif'):
+                        QMessageBox.warning(self, "AVIF unavailable",
+                            "Saving AVIF needs the 'pillow-avif-plugin' package.\n"
+                            "Install it with:  pip install pillow-avif-plugin\n\n"
+                            f"({fmt_err})")
+                        return
+                    raise
+                self.statusBar.showMessage(f"Image saved to {path}", 5000)
+            except Exception as e:
+                QMessageBox.critical(self, "Save Error", f"Failed to save image: {e}")
 
     def export_pdf(self):
         if not self.current_pil_image:
@@ -3382,16 +4144,14 @@ class MainWindow(QMainWindow):
             return
         if not path.lower().endswith(".pdf"):
             path += ".pdf"
-        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
-        try:
-            bg = self.background_color.getRgb()[:3] if self.background_color else (255, 255, 255)
-            image_rgb = flatten_image(self.current_pil_image, bg)
-            export_to_pdf(path, image_rgb, dialog.options())
-            self.statusBar.showMessage(f"PDF exported to {path}", 5000)
-        except Exception as e:
-            QMessageBox.critical(self, "PDF Export Error", f"Failed to export PDF: {e}")
-        finally:
-            QApplication.restoreOverrideCursor()
+        with wait_cursor():
+            try:
+                bg = self.background_color.getRgb()[:3] if self.background_color else (255, 255, 255)
+                image_rgb = flatten_image(self.current_pil_image, bg)
+                export_to_pdf(path, image_rgb, dialog.options())
+                self.statusBar.showMessage(f"PDF exported to {path}", 5000)
+            except Exception as e:
+                QMessageBox.critical(self, "PDF Export Error", f"Failed to export PDF: {e}")
 
     def export_svg(self):
         if not self.current_pil_image:
@@ -3404,50 +4164,86 @@ class MainWindow(QMainWindow):
             return
         if not path.lower().endswith(".svg"):
             path += ".svg"
-        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
-        try:
-            image = self.current_pil_image.copy()
-            if self.background_color:
-                image = flatten_image(image, self.background_color.getRgb()[:3])
-            export_to_svg(path, image, dialog.options())
-            self.statusBar.showMessage(f"SVG exported to {path}", 5000)
-        except Exception as e:
-            QMessageBox.critical(self, "SVG Export Error", f"Failed to export SVG: {e}")
-        finally:
-            QApplication.restoreOverrideCursor()
+        with wait_cursor():
+            try:
+                image = self.current_pil_image
+                if self.background_color:
+                    image = flatten_image(image, self.background_color.getRgb()[:3])
+                export_to_svg(path, image, dialog.options())
+                self.statusBar.showMessage(f"SVG exported to {path}", 5000)
+            except Exception as e:
+                QMessageBox.critical(self, "SVG Export Error", f"Failed to export SVG: {e}")
 
     def copy_to_clipboard(self):
         if not self.current_pil_image:
             return
-        temp_path = None
+        temp_path = self._clipboard_temp_path
+        # The shared file may still back the previous Copy, so write a sibling
+        # and swap it in only once it is complete.
+        part_path = temp_path + ".part"
         try:
-            image_to_copy = self.current_pil_image.copy()
+            image_to_copy = self.current_pil_image
             if self.background_color:
                 image_to_copy = flatten_image(image_to_copy, self.background_color.getRgb()[:3])
-            with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as temp_f:
-                temp_path = temp_f.name
-                image_to_copy.save(temp_path, "PNG")
-            self.temp_files_to_clean.append(temp_path)
+            # One encode backs both the temp file and the inline PNG, so apps
+            # that paste image data rather than files get the alpha too. The
+            # PNG is transient: deflate level 1 encodes several times faster
+            # than Pillow's default 6 for a slightly larger file.
+            buf = io.BytesIO()
+            image_to_copy.save(buf, "PNG", compress_level=1)
+            png_bytes = buf.getvalue()
+            with open(part_path, "wb") as f:
+                f.write(png_bytes)
+            try:
+                os.replace(part_path, temp_path)
+            except PermissionError:
+                # Windows won't replace a file a paste target still has open;
+                # leave that one alone and move this Copy to a fresh name.
+                fd, temp_path = tempfile.mkstemp(prefix="bgremover_clip_", suffix=".png")
+                os.close(fd)
+                os.replace(part_path, temp_path)
+                self._clipboard_temp_path = temp_path
+            if temp_path not in self.temp_files_to_clean:
+                self.temp_files_to_clean.append(temp_path)
             mime_data = QMimeData()
+            mime_data.setData("image/png", QByteArray(png_bytes))
             mime_data.setUrls([QUrl.fromLocalFile(temp_path)])
             QApplication.clipboard().setMimeData(mime_data)
             self.statusBar.showMessage("Image copied to clipboard (preserves transparency).", 4000)
         except Exception as e:
             QMessageBox.critical(self, "Copy Error", f"Failed to copy image: {e}")
-            if temp_path and os.path.exists(temp_path):
+            if os.path.exists(part_path):
                 try:
-                    os.remove(temp_path)
-                    if temp_path in self.temp_files_to_clean:
-                        self.temp_files_to_clean.remove(temp_path)
+                    os.remove(part_path)
                 except OSError as cleanup_error:
                     print(f"Failed to clean up temporary file: {cleanup_error}")
 
+    def _remove_stale_clipboard_files(self):
+        """Delete clipboard PNGs left by earlier sessions that didn't exit
+        cleanly. Recent ones are kept: they may back another instance's Copy."""
+        temp_dir = tempfile.gettempdir()
+        own = os.path.basename(self._clipboard_temp_path)
+        cutoff = time.time() - 24 * 3600
+        try:
+            names = os.listdir(temp_dir)
+        except OSError:
+            return
+        for name in names:
+            if name == own or not (name.startswith("bgremover_clip_") and name.endswith(".png")):
+                continue
+            path = os.path.join(temp_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError as e:
+                print(f"Error cleaning temp file {path}: {e}")
+
     def open_overlay_dialog(self, preload=None):
         if not self.current_pil_image:
             return
         dialog = OverlayDialog(self.current_pil_image, self, preload=preload)
         if dialog.exec() == QDialog.DialogCode.Accepted and dialog.result_pil is not None:
-            self._set_current_image(dialog.result_pil, "Overlay")
+            self._set_current_image(dialog.result_pil, "Overlay", transform=True)
             self.image_label_preview.fit_to_view()
             self.statusBar.showMessage("Images composed & merged.", 5000)
             self._update_ui_states()
@@ -3468,7 +4264,7 @@ class MainWindow(QMainWindow):
             QTimer.singleShot(0, self.image_label_preview.fit_to_view)
             return result
         self.background_color = None
-        self._perform_operation(operation, "Before Page Background", "Building Page…")
+        self._perform_operation(operation, "Before Page Background", "Building Page…", transform=True)
 
     # ---- rotation ----
     def _set_angle(self, angle):
@@ -3503,7 +4299,7 @@ class MainWindow(QMainWindow):
             rotated = img.rotate(-angle, expand=True, resample=Image.BICUBIC)
             QTimer.singleShot(0, self.image_label_preview.fit_to_view)
             return rotated
-        self._perform_operation(operation, "Before Rotation", "Rotating…")
+        self._perform_operation(operation, "Before Rotation", "Rotating…", transform=True)
 
     # ---- drag & drop ----
     def dragEnterEvent(self, event):
@@ -3527,11 +4323,15 @@ class MainWindow(QMainWindow):
                     f"Loaded first image; {len(extras)} more ready to add via Compose.", 5000)
 
     # ---- AI removal ----
-    def _run_async_operation(self, operation_func, description, title):
+    def _run_async_operation(self, operation_func, description, title, setup=None,
+                             transform=False):
         """Run a heavy operation on a worker thread with a live progress dialog
-        and a working Cancel button that always returns control to the user."""
+        and a working Cancel button that always returns control to the user.
+        `setup(worker)` runs before the thread starts, so callers can connect
+        their own slots without racing an operation that finishes at once.
+        Returns the started OperationWorker (None if there is no image)."""
         if not self.current_pil_image:
-            return
+            return None
         progress = QProgressDialog(title, "Cancel", 0, 0, self)
         progress.setWindowTitle("Working…")
         progress.setWindowModality(Qt.WindowModality.WindowModal)
@@ -3540,7 +4340,8 @@ class MainWindow(QMainWindow):
         progress.setAutoReset(False)
         progress.setMinimumWidth(380)
 
-        worker = OperationWorker(operation_func, self.current_pil_image.copy())
+        # Read-only like _perform_operation's input, so no copy is needed.
+        worker = OperationWorker(operation_func, self.current_pil_image)
         self._active_workers.append(worker)
         # Keep the thread object alive until it truly finishes, even if cancelled.
         worker.finished.connect(
@@ -3575,7 +4376,7 @@ class MainWindow(QMainWindow):
         def _on_ok(result):
             if state["finished"]:
                 return
-            self._set_current_image(result, description.replace("Before ", ""))
+            self._set_current_image(result, description.replace("Before ", ""), transform)
             self.statusBar.showMessage(
                 f"{description.replace('Before ', '')} applied.", 5000)
             _finish()
@@ -3599,27 +4400,71 @@ class MainWindow(QMainWindow):
         worker.finished_ok.connect(_on_ok)
         worker.failed.connect(_on_failed)
         progress.canceled.connect(_on_cancel)
+        if setup is not None:
+            setup(worker)
 
         worker.start()
         progress.show()
+        return worker
 
-    def get_rembg_session(self, model):
-        """Return a cached rembg session for `model`, built with the preferred
-        execution providers (GPU/CoreML when enabled and available). Falls back
-        to letting remove_bg build its own session if this fails."""
-        if model in self._rembg_sessions:
-            return self._rembg_sessions[model]
-        try:
-            from rembg import new_session
-            use_gpu = self.settings.value("gpu_acceleration", True, type=bool)
-            providers = preferred_ort_providers(use_gpu)
-            session = (new_session(model, providers=providers)
-                       if providers else new_session(model))
-            self._rembg_sessions[model] = session
+    @staticmethod
+    def _rembg_session_key(model, providers, precision):
+        # Provider entries may carry an options dict; the name identifies them.
+        names = tuple(p if isinstance(p, str) else p[0] for p in providers or ())
+        return model, names, precision
+
+    def get_rembg_session(self, model, providers=None, precision="FP32"):
+        """Return a cached rembg session for `model`, built with `providers`
+        (resolve them on the UI thread with preferred_ort_providers) and
+        `precision` the first time it is needed, so later runs skip loading
+        the ONNX graph. Sessions are cached per (model, providers, precision),
+        so one built for an old preference is never handed out. Safe to call
+        from worker threads (prewarm, batch)."""
+        key = self._rembg_session_key(model, providers, precision)
+        with QMutexLocker(self._rembg_session_lock):
+            session = self._rembg_sessions.get(key)
+            if session is None:
+                session = self._rembg_sessions[key] = new_rembg_session(model, providers, precision)
             return session
-        except Exception as e:
-            print(f"Could not create accelerated rembg session ({e}); using default.")
-            return None
+
+    def _clear_rembg_sessions(self):
+        with QMutexLocker(self._rembg_session_lock):
+            self._rembg_sessions.clear()
+
+    def _warm_up_wand_kernel(self):
+        if not NUMBA_AVAILABLE:
+            return
+        worker = OperationWorker(lambda _img, _report: warm_up_wand_kernel(), None)
+        worker.failed.connect(lambda msg: print(f"Could not compile the Magic Wand kernel: {msg}"))
+        self._start_warmup_worker(worker)
+
+    def _start_warmup_worker(self, worker):
+        """Start a warm-up worker. Loading a model or compiling a kernel can't
+        be interrupted, so closeEvent waits for these without a timeout."""
+        self._active_workers.append(worker)
+        self._warmup_workers.add(worker)
+
+        def _done(w=worker):
+            self._warmup_workers.discard(w)
+            if w in self._active_workers:
+                self._active_workers.remove(w)
+        worker.finished.connect(_done)
+        worker.start()
+
+    def _prewarm_rembg_session(self, model):
+        """Load the session for a newly chosen model in the background so the
+        first removal with it doesn't wait for the graph. Models that aren't
+        downloaded yet are skipped rather than fetched behind the user's back."""
+        if not REMBG_AVAILABLE or not model_is_downloaded(model):
+            return
+        providers = preferred_ort_providers(self.settings.value("gpu_acceleration", True, type=bool))
+        precision = self.settings.value("rembg_precision", "FP32", type=str)
+        if self._rembg_session_key(model, providers, precision) in self._rembg_sessions:
+            return
+        worker = OperationWorker(
+            lambda _img, _report: self.get_rembg_session(model, providers, precision), None)
+        worker.failed.connect(lambda msg: print(f"Could not pre-load rembg model '{model}': {msg}"))
+        self._start_warmup_worker(worker)
 
     def run_rembg(self):
         if not REMBG_AVAILABLE:
@@ -3628,21 +4473,34 @@ class MainWindow(QMainWindow):
         matting = self.alpha_matting_enabled
         fg, bg, er = (self.spin_fg_thresh.value(), self.spin_bg_thresh.value(),
                       self.spin_erode_size.value())
+        # Read everything Qt-owned here so the worker only touches plain data.
+        use_gpu = self.settings.value("gpu_acceleration", True, type=bool)
+        providers = preferred_ort_providers(use_gpu)
+        precision = self.settings.value("rembg_precision", "FP32", type=str)
 
         def operation(img, report):
             report("Preparing AI model…")
             if not model_is_downloaded(model):
                 report(f"Downloading “{model}” model (first use)…")
             report("Running AI background removal…")
-            session = self.get_rembg_session(model)
+            session = self.get_rembg_session(model, providers, precision)
             kwargs = dict(alpha_matting=matting,
                           alpha_matting_foreground_threshold=fg,
                           alpha_matting_background_threshold=bg,
                           alpha_matting_erode_size=er)
-            if session is not None:
-                return remove_bg(img, session=session, **kwargs)
-            return remove_bg(img, model=model, **kwargs)
-        self._run_async_operation(operation, "Before Background Removal", "Removing Background…")
+            return rembg_cutout(img, session, **kwargs)
+        def setup(worker):
+            # Inference can't be interrupted, so keep the button off until the
+            # thread really ends rather than stacking runs after a Cancel.
+            self._rembg_worker = worker
+            self.btn_rembg.setEnabled(False)
+            worker.finished.connect(self._on_rembg_worker_finished)
+        self._run_async_operation(operation, "Before Background Removal", "Removing Background…",
+                                  setup=setup)
+
+    def _on_rembg_worker_finished(self):
+        self._rembg_worker = None
+        self._update_ui_states()
 
     def apply_sharpen(self):
         if not self.current_pil_image:
@@ -3696,7 +4554,7 @@ class MainWindow(QMainWindow):
             return upscale_image(img, scale=scale, model=model, use_ai=use_ai,
                                  sharpen=sharpen, denoise=denoise,
                                  use_gpu=use_gpu, report=report)
-        self._run_async_operation(operation, "Before Upscale", f"Upscaling ×{scale}…")
+        self._run_async_operation(operation, "Before Upscale", f"Upscaling ×{scale}…", transform=True)
 
     def open_model_manager(self):
         dialog = ModelManagerDialog(self)
@@ -3715,62 +4573,108 @@ class MainWindow(QMainWindow):
             cropped_img = img.crop(box)
             QTimer.singleShot(0, self.image_label_preview.fit_to_view)
             return cropped_img
-        self._perform_operation(operation, "Before Crop", "Cropping…")
+        self._perform_operation(operation, "Before Crop", "Cropping…", transform=True)
 
     # ---- magic wand ----
+    def _wand_entry(self):
+        """Cache entry for the current image, keyed by identity (the entry
+        holds the image, so its id can't be recycled while cached)."""
+        pil_image = self.current_pil_image
+        key = id(pil_image)
+        entry = self._wand_sources.get(key)
+        if entry is None or entry[0] is not pil_image:
+            entry = [pil_image, np.ascontiguousarray(pil_image.convert('RGB')), None]
+            self._wand_sources[key] = entry
+            while len(self._wand_sources) > 2:
+                self._wand_sources.popitem(last=False)
+        else:
+            self._wand_sources.move_to_end(key)
+        return entry
+
+    def _wand_source(self):
+        """Contiguous uint8 RGB array of the current image for the Magic Wand,
+        built once per image and reused across clicks."""
+        return self._wand_entry()[1]
+
+    def _wand_preview_source(self):
+        """(rgb, step): the wand source subsampled by a power-of-two `step` so a
+        preview fill touches at most WAND_PREVIEW_PIXELS pixels."""
+        entry = self._wand_entry()
+        if entry[2] is None:
+            full = entry[1]
+            h, w = full.shape[:2]
+            step = 1
+            while (h // step) * (w // step) > self.WAND_PREVIEW_PIXELS:
+                step *= 2
+            rgb = full if step == 1 else np.ascontiguousarray(full[::step, ::step])
+            entry[2] = (rgb, step)
+        return entry[2]
+
+    def _reset_wand_source(self):
+        self._wand_sources.clear()
+        self._wand_seed = None
+        self._scratch.clear()
+
+    def _wand_apply_mask(self):
+        """Full-resolution selection to apply. A subsampled preview is only an
+        approximation, so its fill is re-run on the full image here."""
+        if self._wand_seed is not None:
+            x, y, tolerance = self._wand_seed
+            return wand_flood_fill(self._wand_source(), x, y, tolerance, self._scratch)
+        return self.image_label_preview.wand_selection_mask_np
+
     def calculate_wand_selection(self, start_point):
         if self.current_pil_image is None:
             return
-        if not SCIPY_AVAILABLE:
-            QMessageBox.critical(self, "Error", "Magic Wand requires 'scipy' (pip install scipy).")
+        if not WAND_AVAILABLE:
+            QMessageBox.critical(self, "Error", "Magic Wand requires 'scipy' or 'numba' (pip install scipy).")
             return
-        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
-        try:
-            img = self.current_pil_image.convert('RGB')
-            width, height = img.size
-            x, y = start_point.x(), start_point.y()
-            if not (0 <= x < width and 0 <= y < height):
-                self.image_label_preview.clear_wand_selection()
-                return
-            img_array = np.array(img, dtype=np.int32)
-            target_color = img_array[y, x]
-            tolerance_sq = self.wand_tolerance_spin.value() ** 2
-            color_diff_sq = np.sum((img_array - target_color) ** 2, axis=2)
-            seed_mask = color_diff_sq <= tolerance_sq
-            labeled_array, _ = scipy_label(seed_mask)
-            clicked_label = labeled_array[y, x]
-            if clicked_label == 0:
-                final_mask = np.zeros_like(seed_mask, dtype=bool)
-            else:
-                final_mask = labeled_array == clicked_label
-            mask_pil = Image.fromarray((final_mask * 255).astype(np.uint8), 'L')
-            self.image_label_preview.set_wand_preview(mask_pil)
-        finally:
-            QApplication.restoreOverrideCursor()
-            self._update_ui_states()
+        with wait_cursor():
+            try:
+                rgb, step = self._wand_preview_source()
+                width, height = self.current_pil_image.size
+                x, y = start_point.x(), start_point.y()
+                if not (0 <= x < width and 0 <= y < height):
+                    self.image_label_preview.clear_wand_selection()
+                    return
+                tolerance = self.wand_tolerance_spin.value()
+                final_mask = wand_flood_fill(rgb, x // step, y // step, tolerance, self._scratch)
+                if step > 1:
+                    # One broadcast write into a pooled buffer instead of two np.repeat copies.
+                    hs, ws = final_mask.shape
+                    up = self._scratch.get((hs, step, ws, step), bool)
+                    up[...] = final_mask[:, None, :, None]
+                    final_mask = up.reshape(hs * step, ws * step)[:height, :width]
+                self._wand_seed = (x, y, tolerance) if step > 1 else None
+                # The selection is binary, so keep it as a packed 1-bit '1' image
+                # (an eighth of an 'L' mask) and unpack only where pixels are needed.
+                mask_pil = Image.fromarray(final_mask)
+                self.image_label_preview.set_wand_preview(mask_pil)
+            finally:
+                self._update_ui_states()
 
     def apply_wand_remove(self):
         if self.image_label_preview.wand_selection_mask is None:
             QMessageBox.warning(self, "Warning", "No area selected with the Magic Wand.")
             return
-        selection_mask = self.image_label_preview.wand_selection_mask
         def operation(img):
-            alpha_np = np.array(img.getchannel('A'))
-            alpha_np[np.array(selection_mask, dtype=bool)] = 0
-            img.putalpha(Image.fromarray(alpha_np))
-            return img
+            selection = self._wand_apply_mask()
+            # One RGBA copy, alpha cleared in place (no getchannel/putalpha).
+            data = np.array(img)
+            data[selection, 3] = 0
+            return Image.fromarray(data, 'RGBA')
         self._perform_operation(operation, "Before Wand Remove", "Removing Selected Area…")
 
     def apply_wand_keep(self):
         if self.image_label_preview.wand_selection_mask is None:
             QMessageBox.warning(self, "Warning", "No area selected with the Magic Wand.")
             return
-        selection_mask = self.image_label_preview.wand_selection_mask
         def operation(img):
-            alpha_np = np.array(img.getchannel('A'))
-            alpha_np[~np.array(selection_mask, dtype=bool)] = 0
-            img.putalpha(Image.fromarray(alpha_np))
-            return img
+            selection = self._wand_apply_mask()
+            # One RGBA copy, alpha cleared in place (no getchannel/putalpha).
+            data = np.array(img)
+            data[~selection, 3] = 0
+            return Image.fromarray(data, 'RGBA')
         self._perform_operation(operation, "Before Wand Keep", "Keeping Selected Area…")
 
     # ---- color / mask ----
@@ -3785,33 +4689,48 @@ class MainWindow(QMainWindow):
     def apply_color_removal(self):
         if self.selected_color_rgb is None:
             return
+        color, tolerance = self.selected_color_rgb, self.tolerance_spin.value()
         def operation(img):
-            data = np.array(img.convert("RGBA"))
-            rgb, alpha = data[:, :, :3], data[:, :, 3]
-            diff_sq = np.sum((rgb.astype(np.int32) - np.array(self.selected_color_rgb)) ** 2, axis=2)
-            alpha[diff_sq <= self.tolerance_spin.value() ** 2] = 0
-            data[:, :, 3] = alpha
-            return Image.fromarray(data, 'RGBA')
+            # convert() copies even when the mode already matches.
+            data = np.array(img if img.mode == "RGBA" else img.convert("RGBA"))
+            return Image.fromarray(remove_color(data, color, tolerance, self._scratch), 'RGBA')
         self._perform_operation(operation, "Before Color Removal", "Removing Color…")
 
     def apply_mask_refinement(self):
-        overlay_pixmap = self.image_label_preview.get_overlay_pixmap()
-        if overlay_pixmap.toImage().isNull() or overlay_pixmap.toImage().allGray():
+        keep_mask, remove_mask, box = self.image_label_preview.get_masks()
+        has_keep = keep_mask is not None and keep_mask.any()
+        has_remove = remove_mask is not None and remove_mask.any()
+        if not (has_keep or has_remove):
             QMessageBox.information(self, "Info", "No marks to apply. Use the drawing tools first.")
             return
+        # "Keep" restores pixels from the original, whose coordinates no longer
+        # match once the image was cropped, rotated, warped or resized.
+        keep_skipped = has_keep and self._geometry_changed
+        if keep_skipped:
+            has_keep = False
+            if not has_remove:
+                QMessageBox.information(self, "Info", "\"Keep\" marks can't be applied after the image "
+                                        "was cropped, rotated, warped or resized. Reset the image "
+                                        "to use them.")
+                return
+        # Only the marked bounding box can change, so work on that crop.
         def operation(img):
-            mask_pil = qimage_to_pil(overlay_pixmap.toImage())
-            keep_mask = mask_pil.getchannel('G')
-            if np.any(np.array(keep_mask)):
-                img.paste(self.original_pil_image, (0, 0), keep_mask)
-            remove_mask = mask_pil.getchannel('R')
-            if np.any(np.array(remove_mask)):
-                alpha = img.getchannel('A')
-                alpha = Image.fromarray(np.minimum(np.array(alpha), 255 - np.array(remove_mask)))
-                img.putalpha(alpha)
-            return img
+            region = img.crop(box)
+            if has_keep:
+                region.paste(self.original_pil_image.crop(box), (0, 0), Image.fromarray(keep_mask, 'L'))
+            if has_remove:
+                # alpha = min(alpha, 255 - remove), in place in one RGBA array
+                # rather than via a separate alpha channel image.
+                data = np.array(region)
+                np.minimum(data[:, :, 3], np.invert(remove_mask), out=data[:, :, 3])
+                region = Image.fromarray(data, 'RGBA')
+            result = img.copy()
+            result.paste(region, box[:2])
+            return result
         self._perform_operation(operation, "Before Mask Refinement", "Applying Marks…")
         self.image_label_preview.clear_overlay()
+        if keep_skipped:
+            self.statusBar.showMessage("Remove marks applied; keep marks skipped (image was transformed).", 5000)
 
     # ---- background fill ----
     def fill_background(self):
@@ -3820,7 +4739,7 @@ class MainWindow(QMainWindow):
         color = QColorDialog.getColor(self.background_color or Qt.GlobalColor.white, self, "Choose Background Color")
         if not color.isValid():
             return
-        self._push_state(self.current_pil_image.copy(), "Fill Background")
+        self._push_state(self.current_pil_image, "Fill Background")
         self.background_color = color
         self._update_display()
         self._update_ui_states()
@@ -3828,7 +4747,7 @@ class MainWindow(QMainWindow):
     def remove_background_color(self):
         if self.background_color is None:
             return
-        self._push_state(self.current_pil_image.copy(), "Remove Fill")
+        self._push_state(self.current_pil_image, "Remove Fill")
         self.background_color = None
         self._update_display()
         self._update_ui_states()
@@ -3857,11 +4776,16 @@ class MainWindow(QMainWindow):
         if len(pts) != required:
             QMessageBox.warning(self, "Warning", f"Place all {required} points first.")
             return
-        def operation(img):
-            result = perspective_correct(img, pts)
-            QTimer.singleShot(0, self.image_label_preview.fit_to_view)
-            return result
-        self._perform_operation(operation, "Before Perspective Correction", "Correcting Perspective…")
+        # The warp (and the TPS solve for 6 points) can take seconds on large
+        # images, so run it on a worker; `pts` is plain tuples.
+        def operation(img, report):
+            report("Correcting perspective…")
+            return perspective_correct(img, pts)
+        self._run_async_operation(
+            operation, "Before Perspective Correction", "Correcting Perspective…",
+            setup=lambda worker: worker.finished_ok.connect(
+                lambda _result: QTimer.singleShot(0, self.image_label_preview.fit_to_view)),
+            transform=True)
 
     # ---- about ----
     def show_about(self):
@@ -3901,8 +4825,9 @@ class MainWindow(QMainWindow):
             self.action_theme.blockSignals(False)
             apply_theme(QApplication.instance(), self.current_theme)
             self._refresh_zoom_icons()
-            # Provider preference may have changed; drop cached sessions.
-            self._rembg_sessions.clear()
+            # Provider / precision preference may have changed; drop cached
+            # sessions (a prewarm may be adding one, hence the lock).
+            self._clear_rembg_sessions()
 
     def _refresh_zoom_icons(self):
         """Rebuild the drawn zoom icons for the current theme."""
@@ -3986,7 +4911,12 @@ class MainWindow(QMainWindow):
         for worker in list(self._active_workers):
             worker.cancel()
         for worker in list(self._active_workers):
-            worker.wait(2000)
+            if worker in self._warmup_workers:
+                # Destroying the QThread mid-load would abort the app.
+                with wait_cursor():
+                    worker.wait()
+            else:
+                worker.wait(2000)
         for path in self.temp_files_to_clean:
             if os.path.exists(path):
                 try:
@@ -4137,8 +5067,8 @@ def main():
     splash_msg("Loading AI engine (rembg)…")
     ensure_rembg()
 
-    if not SCIPY_AVAILABLE:
-        print("Warning: 'scipy' not found. Magic Wand disabled. (pip install scipy)")
+    if not WAND_AVAILABLE:
+        print("Warning: neither 'scipy' nor 'numba' found. Magic Wand disabled. (pip install scipy)")
     if not CV2_AVAILABLE:
         print("Warning: 'opencv-python' not found. Perspective correction disabled.")
     if not REMBG_AVAILABLE:
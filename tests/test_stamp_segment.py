@@ -0,0 +1,82 @@
+"""The brush masks must match what the user sees: stamp_segment's footprint
+is compared with the antialiased round-capped QPen the overlay paints."""
+import os
+import sys
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PySide6.QtCore import QPointF, Qt
+from PySide6.QtGui import QColor, QGuiApplication, QImage, QPainter, QPainterPath, QPen
+
+import BACKGROUND_REMOVER_AK_BETA as bg
+
+SIZE = 96
+STROKES = [
+    [(40, 40)],                          # a click
+    [(20, 30), (70, 30)],                # horizontal
+    [(15, 15), (75, 70)],                # diagonal
+    [(20, 70), (35, 25), (60, 60), (80, 20)],   # zig-zag with joins
+]
+
+
+def render_overlay(points, diameter):
+    """Coverage (0..1) of the stroke as InteractiveLabel paints it."""
+    image = QImage(SIZE, SIZE, QImage.Format.Format_ARGB32)
+    image.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    painter.setPen(QPen(QColor(255, 0, 0, 255), diameter, Qt.PenStyle.SolidLine,
+                        Qt.PenCapStyle.RoundCap, Qt.PenJoinStyle.RoundJoin))
+    painter.drawPoint(QPointF(*points[0]))
+    if len(points) > 1:
+        path = QPainterPath(QPointF(*points[0]))
+        for p in points[1:]:
+            path.lineTo(QPointF(*p))
+        painter.drawPath(path)
+    painter.end()
+    ptr = image.constBits()
+    argb = np.frombuffer(ptr, np.uint8).reshape(SIZE, image.bytesPerLine() // 4, 4)[:, :SIZE]
+    return argb[..., 3] / 255.0
+
+
+def stamp(points, diameter):
+    mask = np.zeros((SIZE, SIZE), np.uint8)
+    bg.stamp_segment(mask, points[0], points[0], diameter)
+    for p0, p1 in zip(points, points[1:]):
+        bg.stamp_segment(mask, p0, p1, diameter)
+    return mask > 0
+
+
+class StampSegmentMatchesOverlay(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QGuiApplication.instance() or QGuiApplication([])
+
+    def test_mask_is_inside_the_visible_mark(self):
+        for diameter in range(2, 41):
+            for points in STROKES:
+                with self.subTest(diameter=diameter, points=points):
+                    coverage = render_overlay(points, diameter)
+                    mask = stamp(points, diameter)
+                    self.assertTrue(mask.any())
+                    # Every marked pixel is visibly painted (Qt flattens the round
+                    # caps and joins, so allow some slack below one half)...
+                    self.assertFalse((mask & (coverage < 0.3)).any())
+                    # ...and every fully painted one is marked.
+                    self.assertFalse((~mask & (coverage >= 0.99)).any())
+
+    def test_clipped_to_mask_edges(self):
+        mask = np.zeros((50, 50), np.uint8)
+        box = bg.stamp_segment(mask, (-10, -10), (70, 25), 9)
+        self.assertIsNotNone(box)
+        x0, y0, x1, y1 = box
+        self.assertTrue(0 <= x0 < x1 <= 50 and 0 <= y0 < y1 <= 50)
+        self.assertTrue(mask.any())
+        self.assertIsNone(bg.stamp_segment(mask, (-30, -30), (-20, -20), 9))
+
+
+if __name__ == "__main__":
+    unittest.main()
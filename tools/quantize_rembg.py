@@ -0,0 +1,139 @@
+"""Build reduced-precision copies of the rembg models for Background Remover AK.
+
+Writes <model>_fp16.onnx and/or <model>_int8.onnx next to the stock FP32
+model in the app's models folder; choose them under Preferences -> AI model
+precision. Models without a converted copy keep using FP32.
+
+    python tools/quantize_rembg.py u2net --images ~/Pictures/calibration
+    python tools/quantize_rembg.py isnet-general-use --fp16
+
+INT8 uses static QDQ quantization: activation ranges are calibrated by
+running the FP32 model over a folder of representative photos (around 200
+is plenty). Dynamic quantization is deliberately not offered: it turns
+every Conv into ConvInteger, which onnxruntime runs slower than FP32 on CPU.
+FP16 mainly pays off on GPU providers; on CPU it is usually no faster.
+
+Needs onnx and onnxruntime (its quantization tools) besides rembg. Only
+single-file models (not sam) can be converted.
+"""
+
+import argparse
+import glob
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image  # noqa: E402
+
+from BACKGROUND_REMOVER_AK_BETA import MODELS_DIR, REMBG_MODELS, new_rembg_session  # noqa: E402
+
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".webp", ".bmp", ".tif", ".tiff")
+
+
+def stock_model_path(model_name):
+    """FP32 .onnx for `model_name`, downloading it through rembg if needed."""
+    session = new_rembg_session(model_name)
+    path = os.path.join(MODELS_DIR, f"{model_name}.onnx")
+    if not os.path.exists(path):
+        sys.exit(f"{model_name} is not a single-file model; it can't be converted.")
+    return session, path
+
+
+def convert_fp16(model_name):
+    import onnx
+    from onnxruntime.transformers.float16 import convert_float_to_float16
+    _, src = stock_model_path(model_name)
+    dst = os.path.join(MODELS_DIR, f"{model_name}_fp16.onnx")
+    # FP32 inputs/outputs, so rembg's pre/post-processing is unchanged.
+    model = convert_float_to_float16(onnx.load(src), keep_io_types=True)
+    onnx.save(model, dst)
+    print(f"Wrote {dst}")
+
+
+class _CalibrationReader:
+    """Feeds the model exactly what rembg would: each photo goes through the
+    stock session's predict() and the input it hands onnxruntime is captured.
+    Images are loaded one at a time so a large folder never sits in memory."""
+
+    def __init__(self, session, image_paths):
+        self._paths = iter(image_paths)
+        self._session = session
+        self._feed = None
+        inner = session.inner_session
+        reader = self
+
+        class _Recorder:
+            def __getattr__(self, name):
+                return getattr(inner, name)
+
+            def run(self, output_names, input_feed, *args, **kwargs):
+                reader._feed = input_feed
+                return inner.run(output_names, input_feed, *args, **kwargs)
+
+        session.inner_session = _Recorder()
+
+    def get_next(self):
+        for path in self._paths:
+            try:
+                img = Image.open(path).convert("RGB")
+            except Exception as e:
+                print(f"Skipping {path}: {e}")
+                continue
+            self._feed = None
+            self._session.predict(img)
+            if self._feed is not None:
+                return self._feed
+        return None
+
+
+def convert_int8(model_name, image_dir):
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    paths = sorted(p for p in glob.glob(os.path.join(os.path.expanduser(image_dir), "*"))
+                   if p.lower().endswith(IMAGE_EXTS))
+    if not paths:
+        sys.exit(f"No calibration images found in {image_dir}.")
+    session, src = stock_model_path(model_name)
+    dst = os.path.join(MODELS_DIR, f"{model_name}_int8.onnx")
+    prepped = dst + ".prep.onnx"
+    try:
+        quant_pre_process(src, prepped, skip_symbolic_shape=True)
+    except Exception as e:
+        print(f"Pre-processing skipped ({e}).")
+        prepped = src
+
+    reader = _CalibrationReader(session, paths)
+    data_reader = type("Reader", (CalibrationDataReader,), {"get_next": lambda self: reader.get_next()})()
+    print(f"Calibrating {model_name} on {len(paths)} image(s)…")
+    try:
+        quantize_static(prepped, dst, data_reader,
+                        quant_format=QuantFormat.QDQ,
+                        weight_type=QuantType.QInt8, activation_type=QuantType.QInt8,
+                        # Reduce ranges every few images instead of holding
+                        # every intermediate tensor until the end.
+                        extra_options={"CalibMaxIntermediateOutputs": 8})
+    finally:
+        if prepped != src and os.path.exists(prepped):
+            os.remove(prepped)
+    print(f"Wrote {dst}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("models", nargs="+", choices=[m for m in REMBG_MODELS if m != "sam"])
+    parser.add_argument("--images", help="folder of representative photos for INT8 calibration")
+    parser.add_argument("--fp16", action="store_true", help="also (or, without --images, only) build FP16")
+    args = parser.parse_args()
+    if not args.images and not args.fp16:
+        parser.error("pass --images for INT8 and/or --fp16")
+    for model_name in args.models:
+        if args.fp16:
+            convert_fp16(model_name)
+        if args.images:
+            convert_int8(model_name, args.images)
+
+
+if __name__ == "__main__":
+    main()